@@ -21,7 +21,7 @@ from flask import Blueprint, Response
 import json
 
 from ..updater import updater, APP_ROOT, REPO_URL, SERVICE_NAME
-from ..version import get_local_commit_with_source, get_remote_commit, short_sha
+from ..version import get_local_commit_with_source, short_sha
 
 def attach(bp: Blueprint) -> None:
     @bp.route("/admin/update")
@@ -216,7 +216,7 @@ def attach(bp: Blueprint) -> None:
         except Exception as e:
             err = f"local: {e}"
         try:
-            remote = get_remote_commit(REPO_URL)
+            remote = updater.remote_commit()
         except Exception as e:
             err = (err + "; " if err else "") + f"remote: {e}"
         return Response(json.dumps({
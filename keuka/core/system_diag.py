@@ -7,7 +7,8 @@
 #  - Memory usage from /proc/meminfo (total/used/free/%).
 # -----------------------------------------------------------------------------
 
-import shutil
+import os
+import re
 from datetime import timedelta, datetime
 
 from .utils import sh
@@ -39,28 +40,39 @@ def uptime_seconds() -> float:
 def disk_usage_root() -> dict:
     """Disk usage for '/'. Returns bytes and percent."""
     try:
-        total, used, free = shutil.disk_usage("/")
+        # One statvfs(2); same arithmetic as shutil.disk_usage
+        st = os.statvfs("/")
+        total = st.f_blocks * st.f_frsize
+        used = (st.f_blocks - st.f_bfree) * st.f_frsize
+        free = st.f_bavail * st.f_frsize
         pct = (used / total * 100.0) if total > 0 else 0.0
         return {"total": total, "used": used, "free": free, "percent": round(pct, 1)}
     except Exception:
         return {"total": 0, "used": 0, "free": 0, "percent": 0.0}
 
+# /proc/meminfo is polled every health tick: keep one fd open and re-read it
+# with pread (procfs regenerates the content at offset 0), pulling out only
+# the fields we use.
+_MEMINFO_RE = re.compile(rb"^(MemTotal|MemAvailable):\s+(\d+)", re.M)
+_meminfo_fd = {"fd": None}
+
+def _read_meminfo() -> bytes:
+    fd = _meminfo_fd["fd"]
+    if fd is None:
+        fd = _meminfo_fd["fd"] = os.open("/proc/meminfo", os.O_RDONLY)
+    try:
+        return os.pread(fd, 4096, 0)
+    except OSError:
+        _meminfo_fd["fd"] = None
+        os.close(fd)
+        raise
+
 def mem_usage() -> dict:
     """Parse /proc/meminfo to estimate used/available memory."""
     try:
-        m = {}
-        with open("/proc/meminfo", "r") as f:
-            for ln in f:
-                if ":" in ln:
-                    k, v = ln.split(":", 1)
-                    m[k.strip()] = v.strip()
-        def kib_to_bytes(s: str) -> int:
-            try:
-                return int(s.split()[0]) * 1024
-            except Exception:
-                return 0
-        total = kib_to_bytes(m.get("MemTotal", "0 kB"))
-        avail = kib_to_bytes(m.get("MemAvailable", "0 kB"))
+        m = {k: int(v) * 1024 for k, v in _MEMINFO_RE.findall(_read_meminfo())}
+        total = m.get(b"MemTotal", 0)
+        avail = m.get(b"MemAvailable", 0)
         used = total - avail
         pct = (used / total * 100.0) if total > 0 else 0.0
         return {"total": total, "used": used, "free": avail, "percent": round(pct, 1)}
@@ -8,13 +8,17 @@
 from __future__ import annotations
 
 import os
+import re
 import shutil
 import subprocess
+import tarfile
 import tempfile
 import threading
 import time
+import urllib.request
 from datetime import datetime
-from typing import List, Optional, Tuple
+from collections import deque
+from typing import Deque, List, Optional, Sequence, Tuple
 
 from .version import get_local_commit, get_remote_commit, short_sha
 
@@ -28,6 +32,17 @@ LOG_DIR = os.path.join(APP_ROOT, "logs")
 LOG_FILE = os.path.join(LOG_DIR, "updater.log")
 os.makedirs(LOG_DIR, exist_ok=True)
 
+# In-memory log lines kept for the Admin UI, and how much of updater.log is
+# read back when there are none
+MAX_LOG_LINES = 4000
+LOG_TAIL_BYTES = 512 * 1024
+
+# How long a remote HEAD lookup (git ls-remote) is reused for version checks
+REMOTE_SHA_TTL_S = float(os.environ.get("KEUKA_REMOTE_SHA_TTL_S", "60"))
+
+# git progress updates, e.g. "Receiving objects:  42% (420/1000), 1.2 MiB | 3 MiB/s"
+_GIT_PROGRESS_RE = re.compile(r"^(?:remote: )?[A-Z][a-z]+(?: [a-z]+)*:\s+\d+% \(\d+/\d+\)")
+
 RUN_MARK = "----"
 RUN_HEADER_SUFFIX = "(new run) starting..."
 
@@ -37,20 +52,19 @@ _STATE_SUCCESS = "success"
 _STATE_ERROR = "error"
 
 
-def _append_log_file(line: str) -> None:
-    try:
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
-    except Exception:
-        pass
-
-
-def _read_last_run_from_file(max_lines: int = 4000) -> List[str]:
+def _read_last_run_from_file(max_lines: int = MAX_LOG_LINES) -> List[str]:
     try:
         if not os.path.isfile(LOG_FILE):
             return []
-        with open(LOG_FILE, "r", encoding="utf-8") as f:
-            lines = f.read().splitlines()
+        # Only the tail matters; the file grows for as long as the Pi runs
+        with open(LOG_FILE, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            start = max(0, size - LOG_TAIL_BYTES)
+            f.seek(start)
+            data = f.read()
+        lines = data.decode("utf-8", errors="replace").splitlines()
+        if start > 0 and lines:
+            lines = lines[1:]  # drop the partial first line
         if len(lines) > max_lines:
             lines = lines[-max_lines:]
 
@@ -67,28 +81,62 @@ def _read_last_run_from_file(max_lines: int = 4000) -> List[str]:
         return []
 
 
+def _tarball_url(repo_url: str, sha: Optional[str]) -> Optional[str]:
+    """codeload tarball URL for a GitHub repo at sha, or None if not applicable."""
+    prefix = "https://github.com/"
+    if not sha or not repo_url.startswith(prefix):
+        return None
+    path = repo_url[len(prefix):].rstrip("/")
+    if path.endswith(".git"):
+        path = path[:-4]
+    if path.count("/") != 1:
+        return None
+    return f"https://codeload.github.com/{path}/tar.gz/{sha}"
+
+
 class UpdateManager:
     """Singleton update manager that runs one update at a time and collects logs."""
 
     def __init__(self) -> None:
         self._lock = threading.Lock()
         self._state: str = _STATE_IDLE
-        self._logs: List[str] = []
+        self._logs: Deque[str] = deque(maxlen=MAX_LOG_LINES)
+        # Bumped on every change to _logs; get_logs hands out an immutable
+        # snapshot and only re-copies the deque when this has moved on
+        self._logs_version = 0
+        self._logs_snapshot: Tuple[int, Tuple[str, ...]] = (0, ())
         self._thread: Optional[threading.Thread] = None
         self._started_at: Optional[float] = None
         self._finished_at: Optional[float] = None
         self._tmpdir: Optional[str] = None
         self._cancel_requested: bool = False
         self._sanitized_script_path: Optional[str] = None
+        self._log_fp = None  # updater.log, held open for the duration of a run
+        self._remote_cache: Optional[Tuple[float, str]] = None  # (monotonic ts, sha)
 
     def state(self) -> str:
         with self._lock:
             return self._state
 
-    def get_logs(self) -> Tuple[str, List[str], Optional[float], Optional[float]]:
+    def remote_commit(self, ttl: float = REMOTE_SHA_TTL_S) -> Optional[str]:
+        """Remote HEAD SHA, reusing a lookup younger than ttl seconds."""
         with self._lock:
-            if self._logs:
-                return self._state, list(self._logs), self._started_at, self._finished_at
+            cached = self._remote_cache
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        sha = get_remote_commit(REPO_URL)
+        if sha:
+            with self._lock:
+                self._remote_cache = (time.monotonic(), sha)
+        return sha
+
+    def get_logs(self) -> Tuple[str, Sequence[str], Optional[float], Optional[float]]:
+        version, lines = self._logs_snapshot
+        if version != self._logs_version:
+            with self._lock:
+                version, lines = self._logs_snapshot = self._logs_version, tuple(self._logs)
+        if lines:
+            return self._state, lines, self._started_at, self._finished_at
         return self._state, _read_last_run_from_file(), self._started_at, self._finished_at
 
     def _sweep_leftovers(self) -> None:
@@ -123,6 +171,7 @@ class UpdateManager:
                 return False
             self._state = _STATE_RUNNING
             self._logs.clear()
+            self._logs_version += 1
             self._started_at = time.time()
             self._finished_at = None
             self._cancel_requested = False
@@ -130,10 +179,11 @@ class UpdateManager:
 
             ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             header = f"[{ts}] {RUN_HEADER_SUFFIX}"
-            _append_log_file(RUN_MARK)
-            _append_log_file(header)
+            self._append_log_file(RUN_MARK)
+            self._append_log_file(header)
             self._logs.append(RUN_MARK)
             self._logs.append(header)
+            self._logs_version += 1
 
         t = threading.Thread(target=self._run, name="UpdaterThread", daemon=True)
         t.start()
@@ -143,21 +193,47 @@ class UpdateManager:
 
     def cancel(self) -> None:
         with self._lock:
-            if self._state == _STATE_RUNNING:
+            requested = self._state == _STATE_RUNNING
+            if requested:
                 self._cancel_requested = True
-                self._log("Cancellation requested...")
+        # _log takes the lock itself, so log after releasing it
+        if requested:
+            self._log("Cancellation requested...")
 
     def _log(self, msg: str) -> None:
         ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         line = f"[{ts}] {msg}"
         with self._lock:
             self._logs.append(line)
-        _append_log_file(line)
+            self._logs_version += 1
+            self._append_log_file(line)
+
+    def _append_log_file(self, line: str) -> None:
+        """Append to updater.log; caller holds self._lock.
+
+        The file is opened once per run, line-buffered, rather than opened and
+        closed for every line, which spares the SD card a metadata update each time.
+        """
+        try:
+            if self._log_fp is None:
+                self._log_fp = open(LOG_FILE, "a", encoding="utf-8", buffering=1)
+            self._log_fp.write(line + "\n")
+        except Exception:
+            pass
+
+    def _close_log_file(self) -> None:
+        if self._log_fp is not None:
+            try:
+                self._log_fp.close()
+            except Exception:
+                pass
+            self._log_fp = None
 
     def _finish(self, ok: bool) -> None:
         with self._lock:
             self._state = _STATE_SUCCESS if ok else _STATE_ERROR
             self._finished_at = time.time()
+            self._close_log_file()
 
     def _check_cancel(self) -> bool:
         with self._lock:
@@ -209,7 +285,9 @@ class UpdateManager:
                     return
 
             local_before = get_local_commit(APP_ROOT)
-            remote_head = get_remote_commit(REPO_URL)
+            # An explicit update always asks the remote, so a push made since the
+            # last version check is never skipped as "up-to-date"
+            remote_head = self.remote_commit(ttl=0)
             self._log(f"Local commit before: {short_sha(local_before)}")
             self._log(f"Remote HEAD commit: {short_sha(remote_head)}")
 
@@ -241,37 +319,14 @@ class UpdateManager:
                 self._finish(False)
                 return
 
-            self._log(f"Cloning repo (shallow): {REPO_URL}")
-            rc, out = self._run_cmd(["git", "clone", "--depth", "1", REPO_URL, repo_dir], cwd=tmpdir)
-            self._log(out)
-            if rc != 0:
-                self._log("ERROR: git clone failed.")
-                self._finish(False)
-                return
-
-            if self._check_cancel():
-                self._log("Canceled after clone.")
-                self._finish(False)
-                return
-
-            rc, head_sha = self._run_cmd(["git", "-C", repo_dir, "rev-parse", "HEAD"], cwd=tmpdir)
-            head_sha = (head_sha.strip().splitlines()[-1] if head_sha else "").strip()
-            if rc != 0 or not head_sha:
-                self._log("ERROR: could not determine cloned repo HEAD SHA.")
-                self._finish(False)
-                return
-            self._log(f"Cloned commit: {short_sha(head_sha)}")
-
-            repo_keuka = os.path.join(repo_dir, "keuka")
-            if not os.path.isdir(repo_keuka):
-                self._log("ERROR: 'keuka/' folder not found in cloned repo.")
+            staged_keuka = os.path.join(stage_dir, "keuka")
+            head_sha = self._stage_from_tarball(remote_head, staged_keuka)
+            if head_sha is None and not self._check_cancel():
+                head_sha = self._stage_from_clone(tmpdir, repo_dir, staged_keuka)
+            if head_sha is None:
                 self._finish(False)
                 return
 
-            staged_keuka = os.path.join(stage_dir, "keuka")
-            self._log("Staging latest keuka/ code...")
-            shutil.copytree(repo_keuka, staged_keuka, dirs_exist_ok=True)
-
             if self._check_cancel():
                 self._log("Canceled before apply.")
                 self._finish(False)
@@ -325,22 +380,123 @@ class UpdateManager:
 
             self._finish(ok)
 
-    def _run_cmd(self, cmd: List[str], cwd: Optional[str] = None, env: Optional[dict] = None) -> Tuple[int, str]:
+    def _stage_from_clone(self, tmpdir: str, repo_dir: str, staged_keuka: str) -> Optional[str]:
+        """Shallow-clone the repo and stage its keuka/; returns the cloned SHA."""
+        self._log(f"Cloning repo (shallow): {REPO_URL}")
+        # --progress keeps git reporting while it downloads even though stderr
+        # is a pipe, so a cancel is noticed mid-clone rather than after it
+        rc, out = self._run_cmd(["git", "clone", "--progress", "--depth", "1", REPO_URL, repo_dir],
+                                cwd=tmpdir, cancelable=True)
+        self._log(out)
+        if rc != 0:
+            self._log("ERROR: git clone failed.")
+            return None
+
+        if self._check_cancel():
+            self._log("Canceled after clone.")
+            return None
+
+        rc, head_sha = self._run_cmd(["git", "-C", repo_dir, "rev-parse", "HEAD"], cwd=tmpdir)
+        head_sha = (head_sha.strip().splitlines()[-1] if head_sha else "").strip()
+        if rc != 0 or not head_sha:
+            self._log("ERROR: could not determine cloned repo HEAD SHA.")
+            return None
+        self._log(f"Cloned commit: {short_sha(head_sha)}")
+
+        repo_keuka = os.path.join(repo_dir, "keuka")
+        if not os.path.isdir(repo_keuka):
+            self._log("ERROR: 'keuka/' folder not found in cloned repo.")
+            return None
+
+        self._log("Staging latest keuka/ code...")
+        self._stage_tree(repo_keuka, staged_keuka)
+        return head_sha
+
+    def _stage_tree(self, src: str, dest: str) -> None:
+        """Move src to dest; the clone is scratch, so nothing needs copying on one filesystem."""
+        try:
+            if not os.path.exists(dest) and os.stat(src).st_dev == os.stat(os.path.dirname(dest)).st_dev:
+                os.rename(src, dest)
+                self._log("Staged by rename.")
+                return
+        except OSError as e:
+            self._log(f"NOTICE: rename staging failed ({e}); copying instead.")
+        try:
+            shutil.copytree(src, dest, dirs_exist_ok=True, copy_function=os.link)
+            self._log("Staged by hard links.")
+        except OSError:
+            shutil.copytree(src, dest, dirs_exist_ok=True)
+            self._log("Staged by copy.")
+
+    def _stage_from_tarball(self, sha: Optional[str], staged_keuka: str) -> Optional[str]:
+        """Stage keuka/ from a GitHub tarball of sha; returns sha, or None to fall back to a clone.
+
+        Only keuka/ is extracted, straight from the download stream, so nothing
+        else in the repo is fetched to or written on the SD card.
+        """
+        url = _tarball_url(REPO_URL, sha)
+        if not url:
+            return None
+        self._log(f"Fetching keuka/ from tarball: {url}")
+        try:
+            count = 0
+            with urllib.request.urlopen(url, timeout=60) as resp, \
+                    tarfile.open(fileobj=resp, mode="r|gz") as tar:
+                for member in tar:
+                    if self._check_cancel():
+                        raise RuntimeError("canceled")
+                    # Archive paths are "<repo>-<sha>/keuka/..."
+                    parts = member.name.split("/")
+                    if len(parts) < 3 or parts[1] != "keuka" or ".." in parts:
+                        continue
+                    dest = os.path.join(staged_keuka, *parts[2:])
+                    if member.isdir():
+                        os.makedirs(dest, exist_ok=True)
+                    elif member.isfile():
+                        os.makedirs(os.path.dirname(dest), exist_ok=True)
+                        src = tar.extractfile(member)
+                        with open(dest, "wb") as out:
+                            shutil.copyfileobj(src, out)
+                        os.chmod(dest, member.mode & 0o777)
+                        count += 1
+            if not count:
+                raise RuntimeError("no keuka/ files in archive")
+            self._log(f"Staged {count} files from tarball for commit {short_sha(sha)}")
+            return sha
+        except Exception as e:
+            shutil.rmtree(staged_keuka, ignore_errors=True)
+            if self._check_cancel():
+                self._log("Canceled during tarball fetch.")
+            else:
+                self._log(f"WARNING: tarball fetch failed ({e}); falling back to git clone.")
+            return None
+
+    def _run_cmd(self, cmd: List[str], cwd: Optional[str] = None, env: Optional[dict] = None,
+                 cancelable: bool = False) -> Tuple[int, str]:
+        """Run cmd, logging each output line as it arrives.
+
+        readline blocks until a line or EOF, so no polling sleep is needed. With
+        cancelable=True a pending cancel terminates the process; the replacement
+        script is never run that way, so an apply can't be cut off halfway.
+        Text mode splits git's CR-separated progress updates into lines; only
+        the finished ones (", done.") are logged.
+        """
         try:
             p = subprocess.Popen(
                 cmd, cwd=cwd, env=env,
-                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1
             )
             output_lines: List[str] = []
-            while True:
-                line = p.stdout.readline() if p.stdout else ""
-                if not line and p.poll() is not None:
-                    break
-                if line:
-                    line = line.rstrip("\n")
+            for line in p.stdout:
+                line = line.rstrip("\n")
+                if not _GIT_PROGRESS_RE.match(line) or line.rstrip().endswith("done."):
                     output_lines.append(line)
                     self._log(line)
-                time.sleep(0.01)
+                if cancelable and self._check_cancel():
+                    self._log(f"Canceled; terminating {cmd[0]}.")
+                    p.terminate()
+                    break
+            p.stdout.close()
             rc = p.wait()
             return rc, "\n".join(output_lines)
         except FileNotFoundError:
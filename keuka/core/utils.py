@@ -11,7 +11,9 @@
 
 from __future__ import annotations
 import re
+import socket
 import subprocess
+from functools import lru_cache
 from datetime import datetime
 from pathlib import Path
 from typing import Tuple, List, Any
@@ -66,10 +68,13 @@ def write_text_atomic(path: Path, content: str, sudo_mv: bool = False) -> bool:
         tmp.replace(path)
         return True
 
+@lru_cache(maxsize=1)
 def generate_hardware_sensor_id() -> str:
     """
     Generate hardware-based sensor ID that survives SD card cloning.
-    ID is generated dynamically each time and is unique per hardware.
+    ID is derived from the hardware on first call and cached for the life
+    of the process (CPU serial / MACs don't change under us); call
+    generate_hardware_sensor_id.cache_clear() to force a re-read.
     """
     # Try Raspberry Pi CPU serial first (most reliable)
     try:
@@ -105,7 +110,7 @@ def generate_hardware_sensor_id() -> str:
     # Final fallback - hash of hostname + warning
     try:
         import hashlib
-        hostname = subprocess.getoutput("hostname").strip()
+        hostname = socket.gethostname().strip()
         if hostname:
             hash_id = hashlib.md5(hostname.encode()).hexdigest()[:8]
             return f"sensor-{hash_id}"
@@ -2,6 +2,7 @@
 # Base classes for hardware sensors with proper error handling and logging
 
 import time
+import math
 import logging
 import asyncio
 from abc import ABC, abstractmethod
@@ -12,6 +13,8 @@ from enum import Enum
 # Configure logging
 logger = logging.getLogger(__name__)
 
+_NAN = math.nan
+
 T = TypeVar('T')
 
 class SensorStatus(Enum):
@@ -96,7 +99,7 @@ class BaseSensor(ABC, Generic[T]):
         Returns:
             Fallback value (typically NaN for numeric sensors)
         """
-        return float('nan')  # type: ignore
+        return _NAN  # type: ignore
     
     def _ensure_initialized(self) -> bool:
         """
@@ -274,7 +277,7 @@ class NumericSensor(BaseSensor[float]):
     
     def _get_fallback_value(self) -> float:
         """Return NaN for failed numeric readings."""
-        return float('nan')
+        return _NAN
     
     def read_with_validation(self, min_value: Optional[float] = None, 
                            max_value: Optional[float] = None, 
@@ -293,17 +296,17 @@ class NumericSensor(BaseSensor[float]):
         value = self.read_with_retry(timeout)
         
         # Skip validation if value is already NaN/inf
-        if not (value == value and value != float('inf') and value != float('-inf')):
+        if not math.isfinite(value):
             return value
         
         # Validate range
         if min_value is not None and value < min_value:
             logger.warning(f"{self.name} reading {value} below minimum {min_value}")
-            return float('nan')
+            return _NAN
             
         if max_value is not None and value > max_value:
             logger.warning(f"{self.name} reading {value} above maximum {max_value}")
-            return float('nan')
+            return _NAN
         
         return value
 
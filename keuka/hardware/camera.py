@@ -123,6 +123,10 @@ class Camera:
         self._frame_buffer: deque = deque(maxlen=BUFFER_SIZE)
         self._buffer_lock = threading.Lock()
         self._last_frame_time = 0.0
+        # Waiters block on this until the capture loop appends a new frame;
+        # frame_seq increments per frame so a waiter can ask for "newer than N"
+        self._frame_cond = threading.Condition(self._buffer_lock)
+        self.frame_seq = 0
         
         # Thread pool for async image processing
         self._image_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ImageProcessor")
@@ -308,9 +312,11 @@ class Camera:
                     self.frame = data
                 
                 # Add to ring buffer with timestamp for async access
-                with self._buffer_lock:
+                with self._frame_cond:
                     self._frame_buffer.append((time.time(), data))
                     self._last_frame_time = time.time()
+                    self.frame_seq += 1
+                    self._frame_cond.notify_all()
 
                 # steady-ish frame rate
                 time.sleep(FRAME_INTERVAL)
@@ -343,6 +349,20 @@ class Camera:
                 
             return frame_data
     
+    def wait_jpeg(self, timeout: float = 1.0, newer_than: int = 0) -> Optional[Tuple[int, bytes]]:
+        """
+        Block until a frame with sequence number > newer_than is captured.
+
+        Returns (frame_seq, jpeg_bytes), or None if nothing arrives within
+        timeout. Pass the returned sequence back in to wait for the next frame.
+        """
+        with self._frame_cond:
+            if not self._frame_cond.wait_for(
+                lambda: self.frame_seq > newer_than and self._frame_buffer, timeout
+            ):
+                return None
+            return self.frame_seq, self._frame_buffer[-1][1]
+
     async def get_jpeg_async_await(self, max_age_seconds: float = 1.0, 
                                    timeout: float = 5.0) -> Optional[bytes]:
         """
@@ -359,16 +379,14 @@ class Camera:
     
     def _wait_for_fresh_frame(self, max_age_seconds: float, timeout: float) -> Optional[bytes]:
         """Wait for a fresh frame (blocking helper for async operation)"""
-        start_time = time.time()
-        
-        while time.time() - start_time < timeout:
-            frame = self.get_jpeg_async(max_age_seconds)
-            if frame is not None:
-                return frame
-                
-            # Brief sleep to avoid busy waiting
-            time.sleep(0.01)
-        
+        def _fresh() -> bool:
+            return bool(self._frame_buffer) and time.time() - self._frame_buffer[-1][0] <= max_age_seconds
+
+        # Woken by the capture loop on each new frame instead of polling
+        with self._frame_cond:
+            if self._frame_cond.wait_for(_fresh, timeout):
+                return self._frame_buffer[-1][1]
+
         logger.warning(f"Camera frame timeout after {timeout}s")
         return None
     
@@ -379,6 +397,7 @@ class Camera:
                 "buffer_size": len(self._frame_buffer),
                 "max_buffer_size": BUFFER_SIZE,
                 "last_frame_age": time.time() - self._last_frame_time if self._last_frame_time > 0 else float('inf'),
+                "frame_seq": self.frame_seq,
                 "available": self.available,
                 "running": self.running
             }
@@ -2,7 +2,13 @@
 # NEO-6M GPS module interface via UART/NMEA
 
 import os
+import re
+import math
 import time
+import select
+import threading
+from functools import reduce
+from operator import xor
 from typing import Optional, Tuple, Dict, Any
 
 # GPS hardware UART pins (BCM numbering):
@@ -16,57 +22,147 @@ GPS_PORT = os.environ.get("GPS_PORT", "/dev/serial0")
 GPS_BAUD = int(os.environ.get("GPS_BAUD", "9600"))  # NEO-6M default
 GPS_READ_TIMEOUT_S = float(os.environ.get("GPS_READ_TIMEOUT_S", "0.5"))
 GPS_SESSION_DURATION_S = float(os.environ.get("GPS_SESSION_DURATION_S", "2.0"))
+GPS_HDOP_GOOD = float(os.environ.get("GPS_HDOP_GOOD", "2.0"))  # stop listening once a fix is this precise
+GPS_REOPEN_DELAY_S = 1.0  # wait between attempts to reopen a lost (e.g. unplugged) port
+
+_NAN = math.nan
+
+# GGA/RMC sentences from any talker: type, field body, checksum
+_NMEA_RE = re.compile(rb'^\$(?:..)(GGA|RMC),([^*]*)\*([0-9A-Fa-f]{2})$')
+
+# Serial (pyserial) for GPS if present; imported when the port is first opened
+serial = None  # type: ignore
+_serial_import_attempted = False
+
+def _get_serial():
+    """Import pyserial on first use; None if unavailable."""
+    global serial, _serial_import_attempted
+    if serial is None and not _serial_import_attempted:
+        _serial_import_attempted = True
+        try:
+            import serial as serial_mod  # type: ignore
+            serial = serial_mod
+        except Exception:
+            pass
+    return serial
 
-# Serial (pyserial) for GPS if present
 try:
-    import serial  # type: ignore
-except Exception:
-    serial = None  # type: ignore
+    import fcntl
+except ImportError:  # non-POSIX dev machines
+    fcntl = None  # type: ignore
 
 # Global state
 _gps_ser = None  # type: ignore
+_gps_fd: Optional[int] = None  # non-blocking fd of _gps_ser for direct os.read()
 _gps_last_fix: Optional[Dict[str, Any]] = None  # cache last good fix
+_gps_lock = threading.Lock()
+_gps_fix_event = threading.Event()  # set whenever the reader thread stores a fix
+_gps_thread: Optional[threading.Thread] = None
 
 def _gps_open() -> None:
-    """Lazy-open the GPS serial port."""
-    global _gps_ser
+    """Lazy-open the GPS serial port and start the background reader."""
+    global _gps_ser, _gps_fd, _gps_thread
     if _gps_ser is not None:
         return
-    if serial is None:
+    serial_mod = _get_serial()
+    if serial_mod is None:
         # pyserial not available; leave _gps_ser as None
         return
-    try:
-        _gps_ser = serial.Serial(
-            GPS_PORT,
-            GPS_BAUD,
-            timeout=GPS_READ_TIMEOUT_S
-        )
-        # Give module a brief moment after opening the port
-        time.sleep(0.1)
-    except Exception:
-        _gps_ser = None
+    with _gps_lock:
+        if _gps_ser is not None:
+            return
+        try:
+            _gps_ser = serial_mod.Serial(
+                GPS_PORT,
+                GPS_BAUD,
+                timeout=GPS_READ_TIMEOUT_S
+            )
+            # Larger RX buffer where the platform supports resizing it
+            if hasattr(_gps_ser, "set_buffer_size"):
+                try:
+                    _gps_ser.set_buffer_size(rx_size=4096)
+                except Exception:
+                    pass
+            # Give module a brief moment after opening the port
+            time.sleep(0.1)
+        except Exception:
+            _gps_ser = None
+            return
+        # Read the tty directly: select() + one os.read() drains whatever has
+        # arrived without pyserial's per-call timeout bookkeeping
+        if fcntl is not None:
+            try:
+                fd = _gps_ser.fileno()
+                fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
+                _gps_fd = fd
+            except Exception:
+                _gps_fd = None
+        if _gps_thread is None:
+            _gps_thread = threading.Thread(target=_gps_pump, name="gps-reader", daemon=True)
+            _gps_thread.start()
+
+def _gps_close() -> None:
+    """Close a failed serial port so the reader thread reopens it."""
+    global _gps_ser, _gps_fd
+    with _gps_lock:
+        ser, _gps_ser, _gps_fd = _gps_ser, None, None
+    if ser is not None:
+        try:
+            ser.close()
+        except Exception:
+            pass
 
-def _nmea_checksum_ok(line: str) -> bool:
+def _gps_pump() -> None:
+    """Continuously consume NMEA and publish each complete fix."""
+    global _gps_last_fix
+    while True:
+        if _gps_ser is None:
+            # Port lost (EOF/EIO) or not openable; back off before retrying
+            time.sleep(GPS_REOPEN_DELAY_S)
+            _gps_open()
+            continue
+        snapshot = _merge_fix(_read_nmea_lines(GPS_SESSION_DURATION_S))
+        if "lat" in snapshot and "lon" in snapshot:
+            with _gps_lock:
+                _gps_last_fix = snapshot
+            _gps_fix_event.set()
+
+def _nmea_checksum_ok(line: bytes) -> bool:
     """
     Validate NMEA checksum.
     
     Args:
-        line: NMEA sentence (e.g., '$GPGGA,...*47')
+        line: Raw NMEA sentence bytes (e.g., b'$GPGGA,...*47')
         
     Returns:
         True if checksum is valid, False otherwise
     """
     try:
-        if not line.startswith("$") or "*" not in line:
+        if isinstance(line, str):
+            line = line.encode()
+        if not line.startswith(b"$"):
+            return False
+        star = line.rfind(b"*")
+        if star < 0:
             return False
-        data, cks = line[1:].split("*", 1)
-        calc = 0
-        for ch in data:
-            calc ^= ord(ch)
-        return int(cks.strip(), 16) == calc
+        calc = reduce(xor, line[1:star], 0)
+        return int(line[star + 1:].strip(), 16) == calc
     except Exception:
         return False
 
+# Hemisphere letter -> sign of the decimal-degree value
+_HEMI_SIGN = {"N": 1.0, "S": -1.0, "E": 1.0, "W": -1.0,
+              "n": 1.0, "s": -1.0, "e": 1.0, "w": -1.0}
+
+def _nmea_to_deg(raw: str, width: int) -> Optional[float]:
+    """Convert an NMEA (d)ddmm.mmmm field with `width` degree digits."""
+    if not raw or raw == "0" or raw == "0.0":
+        return None
+    try:
+        return int(raw[:width]) + float(raw[width:]) / 60.0
+    except ValueError:
+        return None
+
 def _parse_lat_lon(lat: str, lat_hemi: str, lon: str, lon_hemi: str) -> Tuple[Optional[float], Optional[float]]:
     """
     Convert NMEA lat/lon to decimal degrees.
@@ -80,28 +176,12 @@ def _parse_lat_lon(lat: str, lat_hemi: str, lon: str, lon_hemi: str) -> Tuple[Op
     Returns:
         Tuple of (latitude_dd, longitude_dd) or (None, None) if invalid
     """
-    def _to_deg(raw: str, is_lon: bool) -> Optional[float]:
-        if not raw or raw == "0" or raw == "0.0":
-            return None
-        try:
-            if is_lon:
-                deg = int(raw[0:3])
-                mins = float(raw[3:])
-            else:
-                deg = int(raw[0:2])
-                mins = float(raw[2:])
-            return deg + mins / 60.0
-        except Exception:
-            return None
-
-    lat_dd = _to_deg(lat, is_lon=False)
-    lon_dd = _to_deg(lon, is_lon=True)
-
-    if lat_dd is not None and lat_hemi in ("S", "s"):
-        lat_dd = -lat_dd
-    if lon_dd is not None and lon_hemi in ("W", "w"):
-        lon_dd = -lon_dd
-
+    lat_dd = _nmea_to_deg(lat, 2)
+    lon_dd = _nmea_to_deg(lon, 3)
+    if lat_dd is not None:
+        lat_dd *= _HEMI_SIGN.get(lat_hemi, 1.0)
+    if lon_dd is not None:
+        lon_dd *= _HEMI_SIGN.get(lon_hemi, 1.0)
     return lat_dd, lon_dd
 
 def _parse_gga(fields: list) -> Optional[Dict[str, Any]]:
@@ -121,8 +201,8 @@ def _parse_gga(fields: list) -> Optional[Dict[str, Any]]:
         lon, lon_h = fields[4], fields[5]
         fixq = int(fields[6]) if fields[6] else 0
         num_sats = int(fields[7]) if fields[7] else 0
-        hdop = float(fields[8]) if fields[8] else float('nan')
-        alt = float(fields[9]) if fields[9] else float('nan')
+        hdop = float(fields[8]) if fields[8] else _NAN
+        alt = float(fields[9]) if fields[9] else _NAN
 
         if fixq == 0:
             # no fix
@@ -164,7 +244,7 @@ def _parse_rmc(fields: list) -> Optional[Dict[str, Any]]:
         lat, lat_h = fields[3], fields[4]
         lon, lon_h = fields[5], fields[6]
         spd_knots = float(fields[7]) if fields[7] else 0.0
-        track = float(fields[8]) if fields[8] else float('nan')
+        track = float(fields[8]) if fields[8] else _NAN
         date = fields[9]
 
         lat_dd, lon_dd = _parse_lat_lon(lat, lat_h, lon, lon_h)
@@ -183,12 +263,33 @@ def _parse_rmc(fields: list) -> Optional[Dict[str, Any]]:
     except Exception:
         return None
 
+def _gps_read_available(timeout: float) -> bytes:
+    """Wait up to timeout for serial data and return whatever has arrived."""
+    if _gps_fd is not None:
+        r, _, _ = select.select([_gps_fd], [], [], timeout)
+        if not r:
+            return b""
+        try:
+            chunk = os.read(_gps_fd, 4096)
+        except BlockingIOError:
+            return b""
+        if not chunk:
+            raise OSError("GPS serial port closed")
+        return chunk
+    # Fallback: only read what the UART already holds so read() never blocks
+    n = _gps_ser.in_waiting
+    if not n:
+        time.sleep(min(timeout, 0.01))
+        return b""
+    return _gps_ser.read(n)
+
 def _read_nmea_lines(duration_s: float) -> Dict[str, Dict[str, Any]]:
     """
-    Read NMEA lines for specified duration and return parsed results.
+    Read NMEA lines until an RMC and a GGA with HDOP <= GPS_HDOP_GOOD have
+    both parsed, or until duration_s elapses.
     
     Args:
-        duration_s: How long to listen for NMEA data
+        duration_s: Upper bound on how long to listen for NMEA data
         
     Returns:
         Dictionary with latest parsed GGA and RMC data
@@ -198,59 +299,64 @@ def _read_nmea_lines(duration_s: float) -> Dict[str, Dict[str, Any]]:
     if _gps_ser is None:
         return results
 
-    end = time.time() + duration_s
-    buf = b""
+    end = time.monotonic() + duration_s
+    buf = bytearray()
 
-    while time.time() < end:
+    while True:
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            break
         try:
-            chunk = _gps_ser.read(128)
+            chunk = _gps_read_available(remaining)
             if not chunk:
                 continue
             buf += chunk
-            # split on CR/LF
-            while b"\n" in buf:
-                line, buf = buf.split(b"\n", 1)
-                line = line.strip().decode(errors="ignore")
-                if not line or not line.startswith("$"):
+            # Consume complete lines in place; a partial sentence stays in buf
+            while True:
+                idx = buf.find(b"\n")
+                if idx < 0:
+                    break
+                line = bytes(buf[:idx]).strip()  # also drops the trailing CR
+                del buf[:idx + 1]
+                # One C-level match filters out GSV/GSA/VTG and splits the sentence
+                m = _NMEA_RE.match(line)
+                if not m:
                     continue
-                # Strip trailing CR if present
-                if line.endswith("\r"):
-                    line = line[:-1]
-                if not _nmea_checksum_ok(line):
+                kind, body, cks = m.groups()
+                if reduce(xor, line[1:m.start(3) - 1], 0) != int(cks, 16):
                     continue
-                # Remove leading '$' and split out fields (exclude checksum part)
-                core = line[1:].split("*", 1)[0]
-                parts = core.split(",")
-                talker = parts[0]  # e.g., GPGGA, GPRMC, GNGGA ...
-                fields = parts
+                fields = [kind.decode()] + body.decode("ascii", errors="ignore").split(",")
 
-                if talker.endswith("GGA"):
+                if kind == b"GGA":
                     gga = _parse_gga(fields)
                     if gga:
                         results["GGA"] = gga  # keep latest
-                elif talker.endswith("RMC"):
+                else:
                     rmc = _parse_rmc(fields)
                     if rmc:
                         results["RMC"] = rmc  # keep latest
+            # NMEA sentences are <= 82 bytes; a longer tail is line noise
+            # (e.g. a baud mismatch), so don't let it accumulate
+            if len(buf) > 512:
+                buf.clear()
+            # Stop once the fix is good enough; a poor one keeps listening
+            # for a better GGA until the window closes
+            fix = results.get("GGA")
+            if fix and "RMC" in results and fix["hdop"] <= GPS_HDOP_GOOD:
+                break
+        except OSError:
+            # EOF or EIO (e.g. a USB receiver unplugged): the port won't
+            # recover, so drop it and let _gps_pump reopen it
+            _gps_close()
+            break
         except Exception:
             # swallow serial errors and continue trying
-            pass
+            time.sleep(0.01)
 
     return results
 
-def read_gps_snapshot(duration_s: float = GPS_SESSION_DURATION_S) -> Dict[str, Any]:
-    """
-    Listen to GPS for specified duration and return a snapshot.
-    
-    Args:
-        duration_s: How long to listen for GPS data
-        
-    Returns:
-        Dictionary with GPS data including lat, lon, alt_m, fix_quality,
-        num_sats, hdop, speed_knots, track_deg, utc, date
-    """
-    global _gps_last_fix
-    res = _read_nmea_lines(duration_s)
+def _merge_fix(res: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge parsed GGA/RMC results into one snapshot dictionary."""
     snapshot: Dict[str, Any] = {}
 
     # Prefer GGA for elevation/fix quality; merge RMC if present
@@ -268,14 +374,24 @@ def read_gps_snapshot(duration_s: float = GPS_SESSION_DURATION_S) -> Dict[str, A
                     snapshot[k] = v
             else:
                 snapshot[k] = v
+    return snapshot
 
-    # Update cache if we have at least lat/lon
-    if "lat" in snapshot and "lon" in snapshot:
-        _gps_last_fix = snapshot
-        return snapshot
-
-    # If no fresh fix, return the last known fix (if any)
-    return _gps_last_fix or {}
+def read_gps_snapshot(duration_s: float = GPS_SESSION_DURATION_S) -> Dict[str, Any]:
+    """
+    Return the latest fix from the background GPS reader.
+    
+    Args:
+        duration_s: How long to wait for a first (or post-clear_last_fix) fix
+        
+    Returns:
+        Dictionary with GPS data including lat, lon, alt_m, fix_quality,
+        num_sats, hdop, speed_knots, track_deg, utc, date
+    """
+    _gps_open()
+    if _gps_thread is not None and not _gps_fix_event.is_set():
+        _gps_fix_event.wait(duration_s)
+    fix = _gps_last_fix
+    return dict(fix) if fix else {}
 
 def read_gps_lat_lon_elev(duration_s: float = GPS_SESSION_DURATION_S) -> Tuple[float, float, float]:
     """
@@ -288,9 +404,9 @@ def read_gps_lat_lon_elev(duration_s: float = GPS_SESSION_DURATION_S) -> Tuple[f
         Tuple of (latitude_dd, longitude_dd, altitude_m). NaN for unavailable values.
     """
     snap = read_gps_snapshot(duration_s)
-    lat = float('nan')
-    lon = float('nan')
-    alt = float('nan')
+    lat = _NAN
+    lon = _NAN
+    alt = _NAN
     try:
         if "lat" in snap:
             lat = float(snap["lat"])
@@ -324,4 +440,6 @@ def get_last_fix() -> Optional[Dict[str, Any]]:
 def clear_last_fix() -> None:
     """Clear the cached GPS fix."""
     global _gps_last_fix
-    _gps_last_fix = None
\ No newline at end of file
+    with _gps_lock:
+        _gps_last_fix = None
+    _gps_fix_event.clear()
\ No newline at end of file
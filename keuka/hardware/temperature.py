@@ -2,6 +2,8 @@
 # DS18B20 temperature sensor interface via 1-Wire
 
 import os
+import time
+import math
 import logging
 from typing import Optional
 
@@ -9,14 +11,31 @@ from .base_sensor import NumericSensor
 
 logger = logging.getLogger(__name__)
 
+_NAN = math.nan
+
 # Default pin configuration
 TEMP_PIN = 6  # BCM numbering (requires 1-Wire enabled in /boot/config.txt)
 
-# DS18B20 via w1thermsensor if present
-try:
-    from w1thermsensor import W1ThermSensor  # type: ignore
-except Exception:
-    W1ThermSensor = None
+# A w1_slave read triggers a ~750ms conversion; reuse a good reading briefly
+TEMP_TTL_S = 1.0
+_temp_cache = {"t": 0.0, "v": _NAN}
+
+# DS18B20 via w1thermsensor if present (imported on first initialization,
+# since importing it scans the 1-Wire bus)
+W1ThermSensor = None
+_w1therm_import_attempted = False
+
+def _get_w1therm():
+    """Import W1ThermSensor on first use; None if unavailable."""
+    global W1ThermSensor, _w1therm_import_attempted
+    if W1ThermSensor is None and not _w1therm_import_attempted:
+        _w1therm_import_attempted = True
+        try:
+            from w1thermsensor import W1ThermSensor as sensor_cls  # type: ignore
+            W1ThermSensor = sensor_cls
+        except Exception:
+            pass
+    return W1ThermSensor
 
 class TemperatureSensor(NumericSensor):
     """
@@ -27,12 +46,14 @@ class TemperatureSensor(NumericSensor):
         super().__init__(name="DS18B20 Temperature", retry_attempts=2, retry_delay=0.2)
         self.pin = pin
         self._w1_sensors = None
+        self._w1_path: Optional[str] = None  # resolved w1_slave path, reused across reads
     
     def _initialize_hardware(self) -> bool:
         """Initialize temperature sensor hardware."""
         try:
-            if W1ThermSensor is not None:
-                self._w1_sensors = W1ThermSensor.get_available_sensors()
+            sensor_cls = _get_w1therm()
+            if sensor_cls is not None:
+                self._w1_sensors = sensor_cls.get_available_sensors()
                 if self._w1_sensors:
                     logger.info(f"Found {len(self._w1_sensors)} DS18B20 sensors via w1thermsensor")
                     return True
@@ -52,14 +73,19 @@ class TemperatureSensor(NumericSensor):
     def _check_sys_interface(self) -> bool:
         """Check if DS18B20 is available via /sys interface."""
         try:
-            base = '/sys/bus/w1/devices'
-            if not os.path.exists(base):
-                return False
-            devices = [d for d in os.listdir(base) if d.startswith('28-')]
-            return len(devices) > 0
+            return self._find_w1_path() is not None
         except Exception:
             return False
     
+    def _find_w1_path(self) -> Optional[str]:
+        """Resolve (and remember) the w1_slave path of the first DS18B20."""
+        with os.scandir('/sys/bus/w1/devices') as it:
+            self._w1_path = next(
+                (os.path.join(e.path, 'w1_slave') for e in it if e.name.startswith('28-')),
+                None,
+            )
+        return self._w1_path
+    
     def _read_raw_data(self) -> float:
         """Read raw temperature data from sensor."""
         # Try w1thermsensor library first
@@ -82,43 +108,55 @@ class TemperatureSensor(NumericSensor):
     
     def _read_sys_fallback(self) -> float:
         """Read temperature directly from /sys/bus/w1/devices interface."""
-        base = '/sys/bus/w1/devices'
-        devices = [d for d in os.listdir(base) if d.startswith('28-')]
-        if not devices:
+        device_path = self._w1_path or self._find_w1_path()
+        if device_path is None:
             raise RuntimeError("No DS18B20 devices found in /sys interface")
             
-        device_path = os.path.join(base, devices[0], 'w1_slave')
-        with open(device_path, 'r') as f:
-            data = f.read()
+        try:
+            with open(device_path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            # Sensor was unplugged or re-enumerated; rediscover next time
+            self._w1_path = None
+            raise
             
         # Check for valid reading (YES indicates successful reading)
-        if 'YES' not in data:
+        if b'YES' not in data:
             raise RuntimeError("DS18B20 sensor reading not ready (CRC error)")
             
         # Extract temperature value (in millidegrees Celsius)
-        if 't=' not in data:
+        idx = data.rfind(b't=')
+        if idx < 0:
+            raise RuntimeError("Invalid DS18B20 data format")
+        try:
+            celsius = int(data[idx + 2:].strip()) * 0.001
+        except ValueError:
             raise RuntimeError("Invalid DS18B20 data format")
-            
-        temp_str = data.strip().split('t=')[-1]
-        celsius = float(temp_str) / 1000.0
         return celsius * 9.0 / 5.0 + 32.0  # Convert to Fahrenheit
     
     def read_celsius(self) -> float:
         """Read temperature in Celsius."""
-        fahrenheit = self.read_with_retry()
+        fahrenheit = self.read_fahrenheit()
         if fahrenheit != fahrenheit:  # Check for NaN
-            return float('nan')
+            return _NAN
         return (fahrenheit - 32.0) * 5.0 / 9.0
     
     def read_fahrenheit(self) -> float:
-        """Read temperature in Fahrenheit."""
-        return self.read_with_retry()
+        """Read temperature in Fahrenheit (reuses a reading younger than TEMP_TTL_S)."""
+        now = time.monotonic()
+        if now - _temp_cache["t"] < TEMP_TTL_S:
+            return _temp_cache["v"]
+        value = self.read_with_retry()
+        if math.isfinite(value):
+            _temp_cache["t"] = time.monotonic()
+            _temp_cache["v"] = value
+        return value
     
     async def read_celsius_async(self) -> float:
         """Read temperature in Celsius asynchronously."""
         fahrenheit = await self.read_async()
         if fahrenheit != fahrenheit:  # Check for NaN
-            return float('nan')
+            return _NAN
         return (fahrenheit - 32.0) * 5.0 / 9.0
     
     async def read_fahrenheit_async(self) -> float:
@@ -1,35 +1,95 @@
 # ultrasonic.py
 # JSN-SR04T waterproof ultrasonic distance sensor interface
 
+import os
 import time
+import math
+import heapq
 import logging
+from array import array
+from collections import deque
 from typing import Optional
 
 from .base_sensor import NumericSensor
 
 logger = logging.getLogger(__name__)
 
+_NAN = math.nan
+
 # Default pin configuration (BCM numbering)
 TRIG_PIN = 23
 ECHO_PIN = 24
 ULTRASONIC_TIMEOUT_S = 0.04
 DEFAULT_SAMPLES = 11
+SAMPLE_GAP_S = 0.075  # JSN-SR04T measurement cycle (~60ms) plus reflection settling
+# Shorter gap when pigpiod times the pings; its edge buffer is cleared before each trigger
+PIGPIO_SAMPLE_GAP_S = 0.03
+MIN_SAMPLES = 3
+# Stop sampling early once MIN_SAMPLES readings agree within this spread (inches)
+STABLE_SPREAD_IN = float(os.environ.get("ULTRASONIC_STABLE_SPREAD_IN", "0.25"))
+
+# GPIO (allow import on dev machines without raising). RPi.GPIO is imported
+# on first hardware initialization rather than at module import; until then
+# GPIO is a no-op stand-in.
+class _DummyGPIO:
+    BCM = BOARD = IN = OUT = LOW = HIGH = PUD_DOWN = PUD_UP = None
+    RISING = FALLING = BOTH = None
+    def setmode(self, *a, **k): pass
+    def setwarnings(self, *a, **k): pass
+    def setup(self, *a, **k): pass
+    def output(self, *a, **k): pass
+    def input(self, *a, **k): return 0
+    def add_event_detect(self, *a, **k): pass
+    def cleanup(self): pass
+
+_DUMMY_GPIO = _DummyGPIO()
+GPIO = _DUMMY_GPIO
+_GPIO_AVAILABLE = False
+_gpio_import_attempted = False
+
+def _get_gpio():
+    """Import RPi.GPIO on first use; keeps the stand-in if unavailable."""
+    global GPIO, _GPIO_AVAILABLE, _gpio_import_attempted
+    if GPIO is _DUMMY_GPIO and not _gpio_import_attempted:
+        _gpio_import_attempted = True
+        try:
+            import RPi.GPIO as gpio  # type: ignore
+            GPIO = gpio
+            _GPIO_AVAILABLE = True
+        except Exception:
+            pass
+    return GPIO
+
+# Below this many samples the pure-Python selection beats numpy's call overhead
+_NUMPY_MIN_SAMPLES = 32
+
+def _numpy():
+    """numpy if installed (imported on first large batch), else None."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
 
-# GPIO (allow import on dev machines without raising)
-try:
-    import RPi.GPIO as GPIO  # type: ignore
-    _GPIO_AVAILABLE = True
-except Exception:
-    class _DummyGPIO:
-        BCM = BOARD = IN = OUT = LOW = HIGH = PUD_DOWN = PUD_UP = None
-        def setmode(self, *a, **k): pass
-        def setwarnings(self, *a, **k): pass
-        def setup(self, *a, **k): pass
-        def output(self, *a, **k): pass
-        def input(self, *a, **k): return 0
-        def cleanup(self): pass
-    GPIO = _DummyGPIO()
-    _GPIO_AVAILABLE = False
+def _median(values) -> float:
+    """Element n//2 of the sorted values, without sorting the whole list."""
+    n = len(values)
+    np = _numpy() if n >= _NUMPY_MIN_SAMPLES else None
+    if np is not None:
+        arr = np.frombuffer(values, dtype=np.float64)  # zero-copy view of array('d')
+        return float(np.partition(arr, n // 2)[n // 2])
+    return heapq.nsmallest(n // 2 + 1, values)[-1]
+
+def _trimmed_mean(values) -> float:
+    """Mean of the middle half of the values (drops top and bottom quarter)."""
+    n = len(values)
+    k = n // 4
+    np = _numpy() if n >= _NUMPY_MIN_SAMPLES else None
+    if np is not None:
+        arr = np.sort(np.frombuffer(values, dtype=np.float64))
+        return float(arr[k:n - k].mean())
+    mid = sorted(values)[k:n - k]
+    return sum(mid) / len(mid)
 
 class UltrasonicSensor(NumericSensor):
     """
@@ -43,9 +103,59 @@ class UltrasonicSensor(NumericSensor):
         self.echo_pin = echo_pin
         self.timeout_s = timeout_s
         self._gpio_initialized = False
-    
+        self._pi = None
+        self._trig_wave: Optional[int] = None  # prebuilt pigpio trigger waveform id
+        self._edges: deque = deque(maxlen=32)
+        self._gpio_edges: deque = deque(maxlen=32)  # RPi.GPIO edge times (perf_counter_ns)
+        self._gpio_events = False  # RPi.GPIO edge callback armed
+
+    def _initialize_pigpio(self) -> bool:
+        """Use pigpiod for trigger and echo timing when the daemon is running."""
+        try:
+            import pigpio  # type: ignore  # optional; imported only when initializing
+        except ImportError:
+            return False
+        try:
+            pi = pigpio.pi()
+            if not pi.connected:
+                return False
+            pi.set_mode(self.trig_pin, pigpio.OUTPUT)
+            pi.set_mode(self.echo_pin, pigpio.INPUT)
+            pi.set_pull_up_down(self.echo_pin, pigpio.PUD_DOWN)
+            pi.write(self.trig_pin, 0)
+            pi.callback(self.echo_pin, pigpio.EITHER_EDGE, self._on_echo_edge)
+            # Build the 2us-low / 10us-high trigger once; pigpiod plays it with DMA timing
+            trig = 1 << self.trig_pin
+            pi.wave_clear()
+            pi.wave_add_generic([
+                pigpio.pulse(0, trig, 2),
+                pigpio.pulse(trig, 0, 10),
+                pigpio.pulse(0, trig, 0),
+            ])
+            wave_id = pi.wave_create()
+            if wave_id >= 0:
+                self._trig_wave = wave_id
+            self._pi = pi
+            logger.info(f"Ultrasonic sensor initialized via pigpio (TRIG={self.trig_pin}, ECHO={self.echo_pin})")
+            return True
+        except Exception as e:
+            logger.warning(f"pigpio unavailable, falling back to RPi.GPIO: {e}")
+            return False
+
+    def _on_echo_edge(self, gpio: int, level: int, tick: int) -> None:
+        # Runs on the pigpio callback thread; deque appends are thread-safe
+        self._edges.append((level, tick))
+
+    def _on_gpio_edge(self, channel: int) -> None:
+        # Runs on RPi.GPIO's event thread. The edges following a trigger
+        # alternate rise/fall, so only the time is recorded.
+        self._gpio_edges.append(time.perf_counter_ns())
+
     def _initialize_hardware(self) -> bool:
         """Initialize GPIO pins for ultrasonic sensor."""
+        if self._initialize_pigpio():
+            return True
+        _get_gpio()
         if not _GPIO_AVAILABLE:
             logger.warning("RPi.GPIO not available (development mode)")
             return False
@@ -56,6 +166,13 @@ class UltrasonicSensor(NumericSensor):
             GPIO.setup(self.trig_pin, GPIO.OUT)
             GPIO.setup(self.echo_pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN)
             GPIO.output(self.trig_pin, GPIO.LOW)
+            # Arm edge detection once, before any trigger, so no echo edge can
+            # pass while a per-ping wait is still being set up
+            try:
+                GPIO.add_event_detect(self.echo_pin, GPIO.BOTH, callback=self._on_gpio_edge)
+                self._gpio_events = True
+            except Exception as e:
+                logger.warning(f"Echo edge detection unavailable, polling instead: {e}")
             time.sleep(0.1)  # Settle time
             self._gpio_initialized = True
             logger.info(f"Ultrasonic sensor initialized (TRIG={self.trig_pin}, ECHO={self.echo_pin})")
@@ -66,34 +183,69 @@ class UltrasonicSensor(NumericSensor):
     
     def _read_raw_data(self) -> float:
         """Perform single ultrasonic distance measurement."""
+        if self._pi is not None:
+            return self._read_raw_pigpio()
         if not self._gpio_initialized:
             raise RuntimeError("GPIO not initialized")
         
         # Send trigger pulse
+        self._gpio_edges.clear()
         GPIO.output(self.trig_pin, GPIO.LOW)
         time.sleep(0.000002)  # 2μs
         GPIO.output(self.trig_pin, GPIO.HIGH)
         time.sleep(0.000010)  # 10μs
         GPIO.output(self.trig_pin, GPIO.LOW)
 
-        # Wait for echo start
-        start = time.time()
-        while GPIO.input(self.echo_pin) == 0:
-            if time.time() - start > self.timeout_s:
-                raise TimeoutError("Echo start timeout")
-
-        # Measure echo duration
-        echo_start = time.time()
-        while GPIO.input(self.echo_pin) == 1:
-            if time.time() - echo_start > self.timeout_s:
-                raise TimeoutError("Echo end timeout")
+        timeout_ns = int(self.timeout_s * 1e9)
+        if self._gpio_events:
+            # The edge callback stamps rise and fall as they are delivered;
+            # sleep between checks rather than spinning on GPIO.input()
+            deadline = time.perf_counter_ns() + 2 * timeout_ns
+            while len(self._gpio_edges) < 2:
+                if time.perf_counter_ns() > deadline:
+                    raise TimeoutError("Echo start timeout" if not self._gpio_edges else "Echo end timeout")
+                time.sleep(0.0005)
+            echo_start, echo_end = self._gpio_edges[0], self._gpio_edges[1]
+        else:
+            # Tight polling loop; the short echo near minimum range is
+            # shorter than sleep granularity
+            deadline = time.perf_counter_ns() + timeout_ns
+            while GPIO.input(self.echo_pin) == 0:
+                if time.perf_counter_ns() > deadline:
+                    raise TimeoutError("Echo start timeout")
+            echo_start = time.perf_counter_ns()
+            deadline = echo_start + timeout_ns
+            while GPIO.input(self.echo_pin) == 1:
+                if time.perf_counter_ns() > deadline:
+                    raise TimeoutError("Echo end timeout")
+            echo_end = time.perf_counter_ns()
+        duration = (echo_end - echo_start) * 1e-9
 
-        echo_end = time.time()
-        duration = echo_end - echo_start
-        
         # Convert to distance (speed of sound = 343 m/s, round trip)
         distance_inches = (duration * 13503.9) / 2.0
         return distance_inches
+
+    def _read_raw_pigpio(self) -> float:
+        """Single measurement with the pulse and echo ticks timed by pigpiod."""
+        self._edges.clear()
+        if self._trig_wave is not None:
+            self._pi.wave_send_once(self._trig_wave)
+        else:
+            self._pi.gpio_trigger(self.trig_pin, 10, 1)  # 10μs high pulse
+
+        rise = None
+        deadline = time.perf_counter_ns() + int(2 * self.timeout_s * 1e9)
+        while time.perf_counter_ns() < deadline:
+            while self._edges:
+                level, tick = self._edges.popleft()
+                if level == 1:
+                    rise = tick
+                elif level == 0 and rise is not None:
+                    # Ticks are 32-bit microseconds and wrap every ~72 minutes
+                    duration = ((tick - rise) & 0xFFFFFFFF) / 1e6
+                    return (duration * 13503.9) / 2.0
+            time.sleep(0.0005)
+        raise TimeoutError("Echo start timeout" if rise is None else "Echo end timeout")
     
     def _process_raw_data(self, raw_data: float) -> float:
         """Process and validate distance reading."""
@@ -111,30 +263,44 @@ class UltrasonicSensor(NumericSensor):
         value = await self.read_async()
         # Apply validation
         if not (0.8 <= value <= 157.5):
-            return float('nan')
+            return _NAN
         return value
     
     def read_median_distance(self, samples: int = DEFAULT_SAMPLES) -> float:
-        """Read median of multiple distance measurements to reduce outliers."""
-        values = []
-        for _ in range(samples):
+        """
+        Read up to `samples` distance measurements and combine them.
+        
+        Returns the median as soon as MIN_SAMPLES readings agree within
+        STABLE_SPREAD_IN; otherwise the trimmed mean of all valid readings.
+        """
+        values = array('d')
+        lo = hi = 0.0
+        for i in range(samples):
             try:
                 value = self.read_distance_inches()
-                if value == value and value != float('inf'):  # Not NaN or inf
+                if math.isfinite(value):
+                    if not values:
+                        lo = hi = value
+                    else:
+                        lo = min(lo, value)
+                        hi = max(hi, value)
                     values.append(value)
-                time.sleep(0.075)  # Brief delay between samples
+                    if len(values) >= MIN_SAMPLES and hi - lo < STABLE_SPREAD_IN:
+                        median = _median(values)
+                        logger.debug(f"Ultrasonic stable: {median} inches from {len(values)} samples")
+                        return median
             except Exception as e:
                 logger.debug(f"Sample read failed: {e}")
-                continue
+            if i + 1 < samples:
+                time.sleep(PIGPIO_SAMPLE_GAP_S if self._pi is not None else SAMPLE_GAP_S)
         
         if not values:
             logger.warning("No valid ultrasonic samples obtained")
-            return float('nan')
+            return _NAN
         
-        values.sort()
-        median = values[len(values) // 2]
-        logger.debug(f"Ultrasonic median: {median} inches from {len(values)} samples")
-        return median
+        distance = _trimmed_mean(values)
+        logger.debug(f"Ultrasonic trimmed mean: {distance} inches from {len(values)} samples")
+        return distance
     
     async def read_median_distance_async(self, samples: int = DEFAULT_SAMPLES) -> float:
         """Read median distance asynchronously."""
@@ -145,20 +311,19 @@ class UltrasonicSensor(NumericSensor):
             task = asyncio.create_task(self.read_distance_inches_async())
             tasks.append(task)
         
-        values = []
+        values = array('d')
         for task in tasks:
             try:
                 value = await task
-                if value == value and value != float('inf'):  # Not NaN or inf
+                if math.isfinite(value):
                     values.append(value)
             except Exception as e:
                 logger.debug(f"Async sample failed: {e}")
         
         if not values:
-            return float('nan')
+            return _NAN
         
-        values.sort()
-        return values[len(values) // 2]
+        return _trimmed_mean(values)
 
 # Create global sensor instance
 _ultrasonic_sensor = UltrasonicSensor()
@@ -11,8 +11,10 @@ import re
 import time
 import ipaddress
 import json
+import socket
+import struct
 from pathlib import Path
-from typing import Optional, List
+from typing import Iterable, Optional, List
 
 from ..core.config import (
     WLAN_STA_IFACE, WLAN_AP_IFACE, WPA_SUP_CONF,
@@ -96,27 +98,34 @@ def wait_for_ip(iface: str, timeout_s: int = 45) -> Optional[str]:
 
 # ---- status / scan / connect ----------------------------------------------
 
+def _leading_int(val: Optional[str]) -> Optional[int]:
+    """Parse the first whitespace token of an iw value ("-52 dBm" -> -52)."""
+    try:
+        return int(val.split(None, 1)[0])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
 def wifi_status_sta():
     """Return link info for station iface using `iw dev <sta> link`."""
     code, out = sh(["/sbin/iw", "dev", WLAN_STA_IFACE, "link"])
-    ssid = rssi = freq = bssid = bitrate = None
+    bssid = None
+    kv: dict[str, str] = {}
     if code == 0:
-        for ln in out.splitlines():
-            s = ln.strip()
-            if s.startswith("SSID:"):
-                ssid = s.split(":", 1)[1].strip()
-            elif s.startswith("signal:"):
-                try: rssi = int(s.split()[1])
-                except: pass
-            elif s.startswith("freq:"):
-                try: freq = int(s.split()[1])
-                except: pass
-            elif s.startswith("tx bitrate:"):
-                bitrate = s.split(":", 1)[1].strip()
-            elif s.startswith("Connected to"):
-                parts = s.split()
-                if len(parts) >= 3:
-                    bssid = parts[2]
+        lines = out.splitlines()
+        # First line is "Connected to <bssid> (on <iface>)" or "Not connected."
+        if lines and lines[0].startswith("Connected to"):
+            parts = lines[0].split()
+            if len(parts) >= 3:
+                bssid = parts[2]
+        # Remaining lines are "key: value"; one partition per line
+        for ln in lines[1:]:
+            key, sep, val = ln.strip().partition(":")
+            if sep:
+                kv[key] = val.strip()
+    ssid = kv.get("SSID")
+    rssi = _leading_int(kv.get("signal"))
+    freq = _leading_int(kv.get("freq"))
+    bitrate = kv.get("tx bitrate")
     return {
         "iface": WLAN_STA_IFACE,
         "ssid": ssid,
@@ -223,6 +232,45 @@ def wifi_connect(ssid: str, psk: str) -> tuple[bool, str, dict]:
 
 # ---- IPv4 info & config ----------------------------------------------------
 
+# Polled on every health payload build; compile once at import
+_INET_CIDR_RE = re.compile(r"inet\s+(\d+\.\d+\.\d+\.\d+/\d+)")
+_DEFAULT_VIA_RE = re.compile(r"default via\s+(\d+\.\d+\.\d+\.\d+)")
+_NAMESERVER_RE = re.compile(r"nameserver\s+(\d+\.\d+\.\d+\.\d+)")
+
+def _best_ipv4(ifinfo: list) -> Optional[str]:
+    """
+    Pick the preferred IPv4/CIDR from `ip -j -4 addr` interface entries.
+    Score: global > link, static > dynamic, non-deprecated preferred.
+    """
+    candidates: list[tuple[int, dict]] = []
+    for ifo in ifinfo:
+        for a in ifo.get("addr_info", []):
+            if a.get("family") != "inet":
+                continue
+            score = 0
+            if a.get("scope") == "global":
+                score += 10
+            if not a.get("dynamic", False):
+                score += 2
+            if not a.get("deprecated", False):
+                score += 1
+            # Prefer addresses whose preferred lifetime isn't zero
+            plt = a.get("preferred_life_time", a.get("preferred_lft"))
+            try:
+                if plt is None or int(plt) != 0:
+                    score += 1
+            except Exception:
+                pass
+            candidates.append((score, a))
+    if candidates:
+        candidates.sort(key=lambda t: t[0], reverse=True)
+        a = candidates[0][1]
+        local = a.get("local")
+        prefix = a.get("prefixlen")
+        if local and prefix is not None:
+            return f"{local}/{prefix}"
+    return None
+
 def ip_addr4(iface: str) -> Optional[str]:
     """
     Return the preferred IPv4/CIDR for an interface.
@@ -233,35 +281,9 @@ def ip_addr4(iface: str) -> Optional[str]:
     code, out = sh(["/sbin/ip", "-j", "-4", "addr", "show", "dev", iface])
     if code == 0 and out.strip():
         try:
-            data = json.loads(out)
-            candidates: list[tuple[int, dict]] = []
-            for ifo in data:
-                for a in ifo.get("addr_info", []):
-                    if a.get("family") != "inet":
-                        continue
-                    # Score: global > link, static > dynamic, non-deprecated preferred
-                    score = 0
-                    if a.get("scope") == "global":
-                        score += 10
-                    if not a.get("dynamic", False):
-                        score += 2
-                    if not a.get("deprecated", False):
-                        score += 1
-                    # Prefer addresses whose preferred lifetime isn't zero
-                    plt = a.get("preferred_life_time", a.get("preferred_lft"))
-                    try:
-                        if plt is None or int(plt) != 0:
-                            score += 1
-                    except Exception:
-                        pass
-                    candidates.append((score, a))
-            if candidates:
-                candidates.sort(key=lambda t: t[0], reverse=True)
-                a = candidates[0][1]
-                local = a.get("local")
-                prefix = a.get("prefixlen")
-                if local and prefix is not None:
-                    return f"{local}/{prefix}"
+            best = _best_ipv4(json.loads(out))
+            if best:
+                return best
         except Exception:
             pass
 
@@ -269,21 +291,65 @@ def ip_addr4(iface: str) -> Optional[str]:
     code, out = sh(["/sbin/ip", "-4", "-o", "addr", "show", "dev", iface])
     if code != 0:
         return None
-    matches = re.findall(r"inet\s+(\d+\.\d+\.\d+\.\d+/\d+)", out)
+    matches = _INET_CIDR_RE.findall(out)
     if matches:
         return matches[-1]
     return None
 
+def ip_addrs4(ifaces: Iterable[str]) -> dict[str, Optional[str]]:
+    """
+    Preferred IPv4/CIDR for several interfaces from a single `ip -j -4 addr`
+    call, instead of one fork per interface. Falls back to ip_addr4() per
+    interface if the JSON listing isn't available.
+    """
+    ifaces = list(ifaces)
+    code, out = sh(["/sbin/ip", "-j", "-4", "addr", "show"])
+    if code == 0 and out.strip():
+        try:
+            data = json.loads(out)
+            return {i: _best_ipv4([ifo for ifo in data if ifo.get("ifname") == i]) for i in ifaces}
+        except Exception:
+            pass
+    return {i: ip_addr4(i) for i in ifaces}
+
+_RTF_GATEWAY = 0x0002
+
+def _proc_default_gateways() -> Optional[dict[str, str]]:
+    """First IPv4 default gateway per interface from /proc/net/route (None if unreadable)."""
+    try:
+        with open("/proc/net/route", "r") as f:
+            lines = f.read().splitlines()[1:]  # skip header
+    except OSError:
+        return None
+    gws: dict[str, str] = {}
+    for ln in lines:
+        parts = ln.split()
+        # Iface Destination Gateway Flags ... (addresses are little-endian hex)
+        if len(parts) < 4 or parts[1] != "00000000":
+            continue
+        try:
+            if not int(parts[3], 16) & _RTF_GATEWAY:
+                continue
+            gw = socket.inet_ntoa(struct.pack("<I", int(parts[2], 16)))
+        except (ValueError, struct.error):
+            continue
+        gws.setdefault(parts[0], gw)
+    return gws
+
 def gw4(iface: str) -> Optional[str]:
+    # Kernel routing table directly; only shell out to `ip` if /proc is unavailable
+    gws = _proc_default_gateways()
+    if gws is not None:
+        return gws.get(iface)
     code, out = sh(["/sbin/ip", "route", "show", "default", "dev", iface])
     if code != 0:
         return None
-    m = re.search(r"default via\s+(\d+\.\d+\.\d+\.\d+)", out)
+    m = _DEFAULT_VIA_RE.search(out)
     return m.group(1) if m else None
 
 def dns_servers() -> list[str]:
     txt = read_text(Path("/etc/resolv.conf"))
-    return re.findall(r"nameserver\s+(\d+\.\d+\.\d+\.\d+)", txt)
+    return _NAMESERVER_RE.findall(txt)
 
 def dhcpcd_current_mode() -> dict:
     conf = read_text(DHCPCD_CONF)
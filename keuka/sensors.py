@@ -2,37 +2,46 @@
 # Unified sensor interface with async support and backward compatibility
 
 import asyncio
+import math
 import logging
 from typing import Optional, Dict, Any, Tuple
 
 from .hardware.async_sensor_manager import sensor_manager, SensorReading
 from .hardware.temperature import _temp_sensor, read_temp_fahrenheit, read_temp_celsius
-from .hardware.ultrasonic import _ultrasonic_sensor, median_distance_inches
-from .hardware.gps import read_gps_lat_lon_elev, read_gps_snapshot
+from .hardware.ultrasonic import _ultrasonic_sensor, read_distance_inches, median_distance_inches
+from .hardware.gps import read_gps_lat_lon_elev, read_gps_snapshot, GPS_SESSION_DURATION_S
 
 logger = logging.getLogger(__name__)
 
+_NAN = math.nan
+
+__all__ = [
+    # Legacy synchronous readers (implemented in keuka.hardware.*)
+    "read_temp_fahrenheit",
+    "read_temp_celsius",
+    "read_distance_inches",
+    "median_distance_inches",
+    "read_gps_lat_lon_elev",
+    "read_gps_snapshot",
+    # Concurrent / async interface
+    "read_all",
+    "read_all_async",
+    "read_all_sensors_async",
+    "read_temperature_async",
+    "read_distance_async",
+    "get_sensor_health",
+    "sensor_health_check",
+    "get_cached_sensor_data",
+    "initialize_sensors",
+    "SensorReading",
+]
+
 # Register sensors with the async manager
 sensor_manager.register_sensor("temperature", _temp_sensor)
 sensor_manager.register_sensor("ultrasonic", _ultrasonic_sensor)
 
-# ============= LEGACY COMPATIBILITY FUNCTIONS =============
-# These maintain backward compatibility with existing code
-
-def read_temp_fahrenheit() -> float:
-    """Read temperature in Fahrenheit (legacy compatibility)."""
-    return _temp_sensor.read_fahrenheit()
-
-def read_temp_celsius() -> float:
-    """Read temperature in Celsius (legacy compatibility)."""
-    return _temp_sensor.read_celsius()
-
-def median_distance_inches(samples: int = 11) -> float:
-    """Read median ultrasonic distance (legacy compatibility)."""
-    return _ultrasonic_sensor.read_median_distance(samples)
-
-# GPS functions remain unchanged since they don't follow the same pattern
-# and are already reasonably optimized
+# The legacy readers above are re-exported as-is from keuka.hardware.*, so
+# there is a single implementation of each.
 
 # ============= NEW ASYNC INTERFACE =============
 # These provide non-blocking sensor operations for web routes
@@ -60,15 +69,15 @@ async def read_all_sensors_async(use_cache: bool = True, timeout: float = 3.0) -
             temp_reading = readings["temperature"]
             if temp_reading.success:
                 result["temperature_f"] = temp_reading.value
-                result["temperature_c"] = (temp_reading.value - 32.0) * 5.0 / 9.0 if temp_reading.value == temp_reading.value else float('nan')
+                result["temperature_c"] = (temp_reading.value - 32.0) * 5.0 / 9.0 if temp_reading.value == temp_reading.value else _NAN
             else:
-                result["temperature_f"] = float('nan')
-                result["temperature_c"] = float('nan')
+                result["temperature_f"] = _NAN
+                result["temperature_c"] = _NAN
         
         # Ultrasonic distance
         if "ultrasonic" in readings:
             dist_reading = readings["ultrasonic"]
-            result["distance_inches"] = dist_reading.value if dist_reading.success else float('nan')
+            result["distance_inches"] = dist_reading.value if dist_reading.success else _NAN
         
         # Add sensor health information
         result["sensor_health"] = {
@@ -85,9 +94,9 @@ async def read_all_sensors_async(use_cache: bool = True, timeout: float = 3.0) -
     except Exception as e:
         logger.error(f"Error reading sensors asynchronously: {e}")
         return {
-            "temperature_f": float('nan'),
-            "temperature_c": float('nan'),
-            "distance_inches": float('nan'),
+            "temperature_f": _NAN,
+            "temperature_c": _NAN,
+            "distance_inches": _NAN,
             "sensor_health": {},
             "error": str(e)
         }
@@ -102,10 +111,10 @@ async def read_temperature_async() -> Tuple[float, float]:
     reading = await sensor_manager.read_sensor_async("temperature")
     if reading.success:
         fahrenheit = reading.value
-        celsius = (fahrenheit - 32.0) * 5.0 / 9.0 if fahrenheit == fahrenheit else float('nan')
+        celsius = (fahrenheit - 32.0) * 5.0 / 9.0 if fahrenheit == fahrenheit else _NAN
         return fahrenheit, celsius
     else:
-        return float('nan'), float('nan')
+        return _NAN, _NAN
 
 async def read_distance_async() -> float:
     """
@@ -115,7 +124,44 @@ async def read_distance_async() -> float:
         Distance in inches or NaN
     """
     reading = await sensor_manager.read_sensor_async("ultrasonic")
-    return reading.value if reading.success else float('nan')
+    return reading.value if reading.success else _NAN
+
+async def read_all_async(samples: int = 11,
+                         gps_duration_s: float = GPS_SESSION_DURATION_S) -> Tuple[float, float, Tuple[float, float, float]]:
+    """
+    Read temperature, distance and GPS concurrently on the sensor thread pool.
+    
+    The three devices are independent, so the call takes as long as the
+    slowest read rather than the sum of all three.
+    
+    Returns:
+        Tuple of (temperature_f, distance_inches, (lat, lon, alt_m))
+    """
+    loop = asyncio.get_running_loop()
+    executor = sensor_manager._get_executor()
+    tF, dIn, gps = await asyncio.gather(
+        loop.run_in_executor(executor, read_temp_fahrenheit),
+        loop.run_in_executor(executor, median_distance_inches, samples),
+        loop.run_in_executor(executor, read_gps_lat_lon_elev, gps_duration_s),
+    )
+    return tF, dIn, gps
+
+def read_all(samples: int = 11,
+             gps_duration_s: float = GPS_SESSION_DURATION_S) -> Tuple[float, float, Tuple[float, float, float]]:
+    """
+    Synchronous counterpart of read_all_async() for Flask handlers.
+    
+    Submits the reads straight to the sensor thread pool rather than
+    spinning up an event loop per request.
+    
+    Returns:
+        Tuple of (temperature_f, distance_inches, (lat, lon, alt_m))
+    """
+    executor = sensor_manager._get_executor()
+    temp_f = executor.submit(read_temp_fahrenheit)
+    gps_f = executor.submit(read_gps_lat_lon_elev, gps_duration_s)
+    dIn = median_distance_inches(samples)  # longest read stays on the caller's thread
+    return temp_f.result(), dIn, gps_f.result()
 
 def get_sensor_health() -> Dict[str, Any]:
     """
@@ -144,9 +190,9 @@ def get_cached_sensor_data() -> Dict[str, Any]:
         Dictionary with cached sensor data
     """
     result = {
-        "temperature_f": float('nan'),
-        "temperature_c": float('nan'),
-        "distance_inches": float('nan'),
+        "temperature_f": _NAN,
+        "temperature_c": _NAN,
+        "distance_inches": _NAN,
         "cache_status": {}
     }
     
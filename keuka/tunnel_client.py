@@ -4,13 +4,23 @@ HTTP Tunnel Client for Pi Sensors
 Establishes SSE connection to keuka.org for web interface proxying
 """
 
+import html
+import itertools
 import json
 import logging
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from urllib.parse import urljoin
+from requests.adapters import HTTPAdapter
+import urllib3
+try:
+    import orjson
+except ImportError:
+    orjson = None
 import os
+import random
+import signal
 import sys
 
 # Add the keuka directory to Python path
@@ -34,12 +44,90 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# orjson is optional; when present it parses tunnel frames straight from bytes
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Tunnel requests are handled on a fixed worker pool; beyond MAX_PENDING_REQUESTS
+# queued + running requests the sensor answers 503 instead of piling up work
+TUNNEL_WORKERS = int(os.environ.get('TUNNEL_WORKERS', '8'))
+MAX_PENDING_REQUESTS = int(os.environ.get('TUNNEL_MAX_PENDING', '32'))
+
+# Largest response body relayed through the tunnel, and the streaming block size
+MAX_RESPONSE_BYTES = int(os.environ.get('TUNNEL_MAX_RESPONSE_BYTES', str(10 * 1024 * 1024)))
+RESPONSE_CHUNK_BYTES = 64 * 1024
+
+# keuka.org pings the tunnel regularly; a stream silent for this long is dead
+SSE_STALE_S = float(os.environ.get('TUNNEL_SSE_STALE_S', '120'))
+
+# Most bytes taken from the SSE socket per read; reads return as soon as any data arrives
+SSE_READ_BYTES = 8192
+
+# Largest SSE frame accepted; a server that never sends a separator can't grow
+# the buffer past this, the stream is dropped and reconnected instead
+SSE_MAX_FRAME_BYTES = int(os.environ.get('TUNNEL_SSE_MAX_FRAME_BYTES', str(1024 * 1024)))
+
+# Retries for response POSTs back to keuka.org on connect errors and timeouts
+POST_MAX_ATTEMPTS = 3
+POST_RETRY_DELAY_S = 0.5
+POST_MAX_RETRY_DELAY_S = 8
+
+# Request headers added by keuka.org that must not reach the local server
+_SKIP_REQ_HEADERS = frozenset({
+    'host', 'x-forwarded-for', 'x-real-ip', 'x-request-id',
+    'x-response-status', 'x-response-headers', 'connection',
+    'cache-control', 'accept-encoding'
+})
+
+# Response headers that might cause issues; requests has already decoded
+# any gzip body, so its Content-Length no longer applies
+_SKIP_RESP_HEADERS = frozenset({
+    'connection', 'transfer-encoding', 'content-encoding', 'content-length'
+})
+
+# Pre-built bodies and header strings for the constant tunnel responses
+_ERROR_HTML = b"""
+<html>
+    <body>
+        <h1>Sensor Error (%d)</h1>
+        <p>The sensor encountered an error processing your request:</p>
+        <p><strong>%s</strong></p>
+        <p><small>Request ID: %s</small></p>
+    </body>
+</html>
+"""
+_ERROR_HEADERS_JSON = json.dumps({'Content-Type': 'text/html'})
+_SSE_BATCH_END = b"event: batch_end\ndata: {\"batch_complete\": true}\n\n"
+_SSE_HEADERS_JSON = json.dumps({
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache',
+    'Connection': 'keep-alive',  # Keep connection alive so browser doesn't treat as error
+})
+
+class _SizedBody:
+    """Iterable request body with a known length, so requests sends Content-Length"""
+    
+    def __init__(self, chunks, length):
+        self._chunks = chunks
+        self._length = length
+    
+    def __iter__(self):
+        return iter(self._chunks)
+    
+    def __len__(self):
+        return self._length
+
+
+class _IncompleteBody(Exception):
+    """The local response body failed or ended before its declared length"""
+
+
 class TunnelClient:
     def __init__(self, sensor_name=None, server_url=None, local_port=5000):
         self.sensor_name = sensor_name or SENSOR_NAME
         self.server_url = server_url or KEUKA_SERVER_URL
         self.local_port = local_port
         self.local_url = f"http://localhost:{local_port}"
+        self._local_url_prefix = self.local_url.rstrip('/')
         
         self.tunnel_url = f"{self.server_url}/api/sensors/{self.sensor_name}/tunnel"
         self.response_url = f"{self.server_url}/api/sensors/{self.sensor_name}/tunnel/response"
@@ -47,10 +135,43 @@ class TunnelClient:
         self.running = False
         self.thread = None
         
+        # Persistent sessions keep connections to the local Flask server and
+        # to keuka.org alive instead of paying TCP/TLS setup per request
+        self._local_session = self._make_session(self.local_url)
+        self._tunnel_session = self._make_session(self.server_url)
+        # The local hop is loopback; a gzip body would only be decoded again here
+        self._local_session.headers['Accept-Encoding'] = 'identity'
+        self._post_headers_base = {'Content-Type': 'application/octet-stream'}
+        
+        self._executor = None
+        self._pending = 0
+        # Set by stop() to cut retry waits short; the live SSE response is kept
+        # so stop() can close it instead of waiting out a blocked read
+        self._stop_event = threading.Event()
+        self._sse_response = None
+        self._pending_lock = threading.Lock()
+        
         logger.info(f"TunnelClient initialized for {self.sensor_name}")
         logger.info(f"Tunnel URL: {self.tunnel_url}")
         logger.info(f"Local Flask server: {self.local_url}")
 
+    @staticmethod
+    def _make_session(base_url):
+        """Session with a connection pool sized for concurrent tunnel requests"""
+        session = requests.Session()
+        # Resolve proxy/CA settings from the environment once for this host and
+        # pin them, rather than letting requests rescan env and ~/.netrc per call
+        settings = session.merge_environment_settings(base_url, {}, None, None, None)
+        session.proxies.update(settings['proxies'])
+        session.verify = settings['verify']
+        session.trust_env = False
+        # One kept-alive connection per worker, plus the SSE stream itself, so
+        # concurrent POSTs to keuka.org reuse connections instead of dropping them
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=TUNNEL_WORKERS + 1, max_retries=0)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
     def start(self):
         """Start the tunnel client in a background thread"""
         if self.running:
@@ -58,15 +179,28 @@ class TunnelClient:
             return
             
         self.running = True
-        self.thread = threading.Thread(target=self._run_tunnel, daemon=True)
+        self._stop_event.clear()
+        self._executor = ThreadPoolExecutor(max_workers=TUNNEL_WORKERS, thread_name_prefix="tunnel-req")
+        self.thread = threading.Thread(target=self._run_tunnel, name="tunnel-sse", daemon=True)
         self.thread.start()
         logger.info("Tunnel client started")
 
     def stop(self):
         """Stop the tunnel client"""
         self.running = False
+        self._stop_event.set()
+        response = self._sse_response
+        if response is not None:
+            response.close()
         if self.thread and self.thread.is_alive():
             self.thread.join(timeout=5)
+        if self._executor is not None:
+            if self._pending:
+                logger.warning(f"Stopping with {self._pending} tunnel request(s) queued or in flight")
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._local_session.close()
+        self._tunnel_session.close()
         logger.info("Tunnel client stopped")
 
     def _run_tunnel(self):
@@ -83,90 +217,149 @@ class TunnelClient:
                     'Cache-Control': 'no-cache',
                     'Accept': 'text/event-stream',
                     'Connection': 'keep-alive',
+                    'Accept-Encoding': 'identity',  # Frames are scanned as they arrive
                     'User-Agent': 'KeukaSensorTunnel/1.0'
                 }
                 
-                # Use longer timeout and disable verify for local testing if needed
-                session = requests.Session()
-                session.headers.update(headers)
-                response = session.get(
+                # The stream shares the pooled keuka.org session with the response POSTs
+                response = self._tunnel_session.get(
                     self.tunnel_url, 
                     stream=True, 
-                    timeout=(30, None),  # 30s connect, infinite read
+                    timeout=(30, SSE_STALE_S),  # 30s connect; a silent stream raises instead of hanging
                     headers=headers
                 )
-                response.raise_for_status()
-                
-                retry_delay = 1  # Reset retry delay on successful connection
-                
-                # Process SSE messages with improved chunked handling
-                last_heartbeat = time.time()
-                
+                self._sse_response = response
                 try:
-                    for line in response.iter_lines(decode_unicode=True, chunk_size=1):
+                    response.raise_for_status()
+                    
+                    retry_delay = 1  # Reset retry delay on successful connection
+                    
+                    # Without read1 (urllib3 < 2), a close-delimited stream would block
+                    # until a block fills and must be read byte by byte; a chunked one
+                    # hands each chunk over as it arrives. Staleness is caught by the
+                    # read timeout above.
+                    chunk_size = 4096 if response.raw.chunked else 1
+                    
+                    for frame in self._iter_sse_frames(response, chunk_size):
                         if not self.running:
                             break
-                        
-                        # Update heartbeat on any activity (including None/empty lines)
-                        current_time = time.time()
-                        last_heartbeat = current_time
-                        
-                        # Check for connection staleness
-                        if current_time - last_heartbeat > 120:  # Extended to 2 minutes
-                            logger.warning("No SSE activity for 120+ seconds, reconnecting...")
-                            break
-                        
-                        if line is None:
-                            continue
-                            
-                        line = line.strip()
-                        
-                        # SSE format: "data: {json}"
-                        if line.startswith('data: '):
-                            data_str = line[6:]  # Remove "data: " prefix
-                            if data_str.strip():
-                                try:
-                                    data = json.loads(data_str)
-                                    if data.get('type') == 'connected':
-                                        logger.info(f"Tunnel established for {data.get('sensorName')}")
-                                    elif data.get('type') == 'http_request':
-                                        # Handle request in a separate thread to avoid blocking SSE stream
-                                        request_thread = threading.Thread(
-                                            target=self._handle_http_request,
-                                            args=(data,),
-                                            daemon=True,
-                                            name=f"tunnel-req-{data.get('requestId', 'unknown')}"
-                                        )
-                                        request_thread.start()
-                                    elif data.get('type') == 'ping':
-                                        logger.debug("Received server ping")
-                                except json.JSONDecodeError as e:
-                                    logger.error(f"Failed to parse SSE data: {e}")
-                                except Exception as e:
-                                    logger.error(f"Error processing SSE message: {e}")
-                        elif line == "":
-                            # Empty line - message boundary
-                            logger.debug("SSE message boundary")
-                        elif line.startswith(':'):
-                            # Comment line
-                            logger.debug(f"SSE comment: {line}")
-                        else:
-                            # Other SSE fields (event, id, retry)
-                            logger.debug(f"SSE field: {line}")
+                        self._handle_sse_frame(frame)
+                except requests.HTTPError:
+                    # A rejected connect backs off in the outer handler
+                    raise
+                except (requests.RequestException, urllib3.exceptions.HTTPError) as stream_error:
+                    # Includes the read timeout on a stalled stream
+                    logger.warning(f"SSE stream interrupted, reconnecting: {stream_error}")
                 except Exception as chunk_error:
-                    logger.error(f"Chunked encoding error: {chunk_error}")
-                    break
+                    # stop() closing the stream underneath us lands here too
+                    if self.running:
+                        logger.error(f"Chunked encoding error: {chunk_error}")
+                finally:
+                    self._sse_response = None
+                    response.close()
                             
             except requests.RequestException as e:
                 if self.running:
                     logger.error(f"Tunnel connection failed: {e}")
                     logger.info(f"Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
+                    self._stop_event.wait(retry_delay)
                     retry_delay = min(retry_delay * 2, max_retry_delay)
             except Exception as e:
                 if self.running:
                     logger.error(f"Unexpected tunnel error: {e}")
-                    time.sleep(retry_delay)
+                    self._stop_event.wait(retry_delay)
+
+    @staticmethod
+    def _iter_sse_chunks(response, chunk_size):
+        """Yield stream data as it arrives, in blocks of up to SSE_READ_BYTES"""
+        read1 = getattr(response.raw, 'read1', None)
+        if read1 is None:
+            # urllib3 < 2 has no read1; fall back to requests' block iterator
+            yield from response.iter_content(chunk_size=chunk_size)
+            return
+        while True:
+            # Decoded in case a proxy compresses the stream despite identity
+            chunk = read1(SSE_READ_BYTES, decode_content=True)
+            if not chunk:
+                return
+            yield chunk
+
+    @classmethod
+    def _iter_sse_frames(cls, response, chunk_size):
+        """Yield raw SSE frames (the bytes between blank-line separators)"""
+        buf = bytearray()
+        for chunk in cls._iter_sse_chunks(response, chunk_size):
+            # CRLF is normalized per chunk, including a pair split across chunks
+            if buf.endswith(b"\r") and chunk.startswith(b"\n"):
+                del buf[-1]
+            # Only the new data (plus one byte of overlap) needs scanning
+            scan = max(len(buf) - 1, 0)
+            buf += chunk.replace(b"\r\n", b"\n") if b"\r" in chunk else chunk
+            i = buf.find(b"\n\n", scan)
+            while i >= 0:
+                frame = bytes(buf[:i])
+                del buf[:i + 2]
+                yield frame
+                i = buf.find(b"\n\n")
+            if len(buf) > SSE_MAX_FRAME_BYTES:
+                logger.warning(f"SSE frame exceeds {SSE_MAX_FRAME_BYTES} bytes, dropping stream")
+                return
+
+    def _handle_sse_frame(self, frame):
+        """Dispatch one SSE frame; field names are matched on bytes, only JSON is decoded"""
+        data_parts = []
+        for line in frame.split(b"\n"):
+            if line.startswith(b"data:"):
+                value = line[5:]
+                data_parts.append(value[1:] if value.startswith(b" ") else value)
+            elif line.startswith(b":"):
+                logger.debug("SSE comment")
+            elif line:
+                # Other SSE fields (event, id, retry); formatted only if debug is on
+                logger.debug("SSE field: %r", line[:40])
+        if not data_parts:
+            return
+        payload = data_parts[0] if len(data_parts) == 1 else b"\n".join(data_parts)
+        if not payload or payload.isspace():
+            return
+        try:
+            data = _json_loads(payload)
+            if data.get('type') == 'connected':
+                logger.info(f"Tunnel established for {data.get('sensorName')}")
+            elif data.get('type') == 'http_request':
+                # Handle request on the worker pool to avoid blocking SSE stream
+                self._dispatch_request(data)
+            elif data.get('type') == 'ping':
+                logger.debug("Received server ping")
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse SSE data: {e}")
+        except Exception as e:
+            logger.error(f"Error processing SSE message: {e}")
+
+    def _dispatch_request(self, request_data):
+        """Queue a tunnel request on the worker pool, or answer 503 when saturated"""
+        request_id = request_data.get('requestId', 'unknown')
+        with self._pending_lock:
+            busy = self._pending >= MAX_PENDING_REQUESTS
+            if not busy:
+                self._pending += 1
+        if busy:
+            logger.warning(f"Tunnel request queue full, rejecting request {request_id}")
+            # This runs on the SSE reader thread, so it gets one attempt and no backoff
+            self._send_error_response(request_id, "The sensor is busy - please retry", status_code=503,
+                                      max_attempts=1)
+            return
+        try:
+            future = self._executor.submit(self._handle_http_request, request_data)
+        except (RuntimeError, AttributeError):
+            # Executor shut down (or cleared) by stop()
+            self._request_done(None)
+            return
+        future.add_done_callback(self._request_done)
+
+    def _request_done(self, _future):
+        with self._pending_lock:
+            self._pending -= 1
 
     def _handle_http_request(self, request_data):
         """Process an HTTP request from the tunnel and send response back"""
@@ -182,7 +375,7 @@ class TunnelClient:
             logger.info(f"Processing {method} {path} (ID: {request_id})")
             
             # Forward request to local Flask server
-            local_url = urljoin(self.local_url, path)
+            local_url = self._local_url_prefix + (path if path.startswith('/') else '/' + path)
             
             # Prepare request parameters with more robust timeout
             request_kwargs = {
@@ -193,23 +386,21 @@ class TunnelClient:
             }
             
             # Handle request body
+            json_body = False
             if body and method.upper() in ['POST', 'PUT', 'PATCH']:
-                if isinstance(body, dict):
+                if isinstance(body, dict) and orjson is not None:
+                    # Serialized by orjson rather than requests' json.dumps
+                    request_kwargs['data'] = orjson.dumps(body)
+                    json_body = True
+                elif isinstance(body, dict):
                     request_kwargs['json'] = body
                 else:
                     request_kwargs['data'] = body
             
             # Forward relevant headers (exclude keuka.org specific headers)
-            forward_headers = {}
-            skip_headers = {
-                'host', 'x-forwarded-for', 'x-real-ip', 'x-request-id', 
-                'x-response-status', 'x-response-headers', 'connection',
-                'cache-control', 'accept-encoding'
-            }
-            
-            for key, value in headers.items():
-                if key.lower() not in skip_headers:
-                    forward_headers[key] = value
+            forward_headers = {k: v for k, v in headers.items() if k.lower() not in _SKIP_REQ_HEADERS}
+            if json_body and not any(k.lower() == 'content-type' for k in forward_headers):
+                forward_headers['Content-Type'] = 'application/json'
                     
             if forward_headers:
                 request_kwargs['headers'] = forward_headers
@@ -218,9 +409,8 @@ class TunnelClient:
             try:
                 # Check if this looks like an SSE request
                 is_sse_request = (
-                    path.endswith('.sse') or 
-                    path.endswith('/sse') or
-                    forward_headers.get('Accept', '').find('text/event-stream') != -1
+                    path.endswith(('.sse', '/sse')) or
+                    'text/event-stream' in forward_headers.get('Accept', '')
                 )
                 
                 if is_sse_request:
@@ -228,8 +418,9 @@ class TunnelClient:
                     logger.info(f"Handling SSE stream for {method} {path} (ID: {request_id})")
                     self._handle_sse_request(request_id, request_kwargs)
                 else:
-                    # Handle normal requests
-                    response = requests.request(**request_kwargs)
+                    # Handle normal requests; the body is streamed on to the tunnel
+                    request_kwargs['stream'] = True
+                    response = self._local_session.request(**request_kwargs)
                     logger.debug(f"Local request successful: {response.status_code} (ID: {request_id})")
                     
                     # Send response back through tunnel
@@ -265,78 +456,75 @@ class TunnelClient:
             
             logger.info(f"Collecting SSE events for {request_id}")
             
-            response = requests.request(**request_kwargs)
-            
-            if response.status_code != 200:
-                logger.warning(f"SSE request failed with status {response.status_code} (ID: {request_id})")
-                self._send_error_response(request_id, f"SSE endpoint returned {response.status_code}", response.status_code)
-                return
-            
-            # Collect multiple SSE events for a better user experience
-            sse_content = ""
-            line_buffer = ""
-            events_collected = 0
-            max_events = 3  # Collect up to 3 events
-            start_time = time.time()
+            response = self._local_session.request(**request_kwargs)
             
-            try:
-                # Read multiple SSE events
-                for chunk in response.iter_content(chunk_size=512, decode_unicode=True):
-                    if not chunk:
-                        continue
-                        
-                    line_buffer += chunk
-                    sse_content += chunk
-                    
-                    # Check if we have a complete SSE event (ends with \n\n)
-                    if '\n\n' in line_buffer:
-                        events_collected += 1
-                        line_buffer = ""  # Reset for next event
-                        
-                        # Stop after collecting enough events or timeout
-                        if events_collected >= max_events or (time.time() - start_time) > 30:
-                            break
-                    
-                    # Safety limit - don't let SSE content get too large
-                    if len(sse_content) > 100000:  # 100KB limit
-                        logger.warning(f"SSE content too large for request {request_id}, stopping collection")
-                        break
+            with response:
+                if response.status_code != 200:
+                    logger.warning(f"SSE request failed with status {response.status_code} (ID: {request_id})")
+                    self._send_error_response(request_id, f"SSE endpoint returned {response.status_code}", response.status_code)
+                    return
                 
-                # Close the response stream
-                response.close()
+                # Relay a few SSE events for a better user experience. Events are
+                # forwarded to keuka.org as they arrive rather than batched in memory.
+                events_collected = 0
+                sent = 0
+                max_events = 3  # Collect up to 3 events
+                start_time = time.monotonic()
                 
-                if sse_content.strip():
-                    # Send the collected SSE content as a complete response
-                    response_headers = {
-                        'Content-Type': 'text/event-stream',
-                        'Cache-Control': 'no-cache',
-                        'Connection': 'keep-alive',  # Keep connection alive so browser doesn't treat as error
-                    }
+                try:
+                    chunks = response.iter_content(chunk_size=512)
+                    first = next((chunk for chunk in chunks if chunk), None)
+                    if first is None:
+                        logger.warning(f"No SSE content received for request {request_id}")
+                        self._send_error_response(request_id, "No SSE data received", status_code=204)
+                        return
                     
-                    # Add a final event to signal end of this batch
-                    sse_content += "event: batch_end\ndata: {\"batch_complete\": true}\n\n"
+                    def body():
+                        nonlocal events_collected, sent
+                        line_buffer = bytearray()
+                        for chunk in itertools.chain((first,), chunks):
+                            if not chunk:
+                                continue
+                            sent += len(chunk)
+                            yield chunk
+                            line_buffer += chunk
+                            
+                            # Count each complete SSE event (ends with \n\n)
+                            idx = line_buffer.find(b'\n\n')
+                            while idx >= 0:
+                                events_collected += 1
+                                del line_buffer[:idx + 2]
+                                idx = line_buffer.find(b'\n\n')
+                            
+                            # Stop after collecting enough events or timeout
+                            if events_collected >= max_events or (time.monotonic() - start_time) > 30:
+                                break
+                            
+                            # Safety limit - don't let SSE content get too large
+                            if sent > 100000:  # 100KB limit
+                                logger.warning(f"SSE content too large for request {request_id}, stopping collection")
+                                break
+                        
+                        # Add a final event to signal end of this batch
+                        yield _SSE_BATCH_END
                     
-                    tunnel_response = requests.post(
-                        self.response_url,
-                        data=sse_content.encode('utf-8'),
+                    # A streamed batch can't be replayed, so this POST gets a single attempt
+                    self._post_response(
+                        body(),
                         headers={
                             'X-Request-ID': request_id,
                             'X-Response-Status': '200',
-                            'X-Response-Headers': json.dumps(response_headers),
-                            'Content-Type': 'application/octet-stream'
+                            'X-Response-Headers': _SSE_HEADERS_JSON
                         },
-                        timeout=15
+                        timeout=15,
+                        max_attempts=1
                     )
-                    tunnel_response.raise_for_status()
                     
-                    logger.info(f"SSE batch sent for request {request_id} ({events_collected} events, {len(sse_content)} bytes)")
-                else:
-                    logger.warning(f"No SSE content received for request {request_id}")
-                    self._send_error_response(request_id, "No SSE data received", status_code=204)
+                    logger.info(f"SSE batch sent for request {request_id} ({events_collected} events, {sent} bytes)")
                     
-            except requests.RequestException as e:
-                logger.error(f"SSE stream error for request {request_id}: {e}")
-                self._send_error_response(request_id, "SSE connection failed", status_code=502)
+                except requests.RequestException as e:
+                    logger.error(f"SSE stream error for request {request_id}: {e}")
+                    self._send_error_response(request_id, "SSE connection failed", status_code=502)
                 
         except Exception as e:
             logger.error(f"Error handling SSE request {request_id}: {e}")
@@ -345,40 +533,91 @@ class TunnelClient:
     def _send_response(self, request_id, response):
         """Send HTTP response back through the tunnel"""
         try:
-            # Prepare response headers
-            response_headers = {}
-            for key, value in response.headers.items():
-                # Skip headers that might cause issues
-                if key.lower() not in ['connection', 'transfer-encoding', 'content-encoding']:
-                    response_headers[key] = value
+            # The local response is always closed here, whether or not the body
+            # was read to the end, so its connection never lingers
+            with response:
+                # Prepare response headers
+                response_headers = {k: v for k, v in response.headers.items() if k.lower() not in _SKIP_RESP_HEADERS}
+                
+                # Limit response size to prevent tunnel overload. The cap is
+                # enforced while streaming; a declared oversize body is flagged up front.
+                declared = response.headers.get('Content-Length')
+                declared = int(declared) if declared and declared.isdigit() else None
+                if declared is not None and declared > MAX_RESPONSE_BYTES:
+                    logger.warning(f"Response too large ({declared} bytes), truncating (ID: {request_id})")
+                    response_headers['X-Truncated'] = 'true'
+                
+                sent = 0
+                
+                def body(length=None):
+                    # Relay the local body in blocks instead of holding it all in memory,
+                    # and stop reading from the local server once the cap is reached.
+                    # Raising mid-upload aborts the POST rather than completing it
+                    # with a short or mismatched body.
+                    nonlocal sent
+                    try:
+                        for chunk in response.iter_content(RESPONSE_CHUNK_BYTES):
+                            room = MAX_RESPONSE_BYTES - sent
+                            if len(chunk) > room:
+                                sent += room
+                                yield chunk[:room]
+                                logger.warning(f"Response exceeded {MAX_RESPONSE_BYTES} bytes, truncated (ID: {request_id})")
+                                return
+                            sent += len(chunk)
+                            yield chunk
+                    except requests.RequestException as e:
+                        raise _IncompleteBody(f"local body failed after {sent} bytes: {e}") from e
+                    if length is not None and sent != length:
+                        raise _IncompleteBody(f"local body ended after {sent} of {length} bytes")
+                
+                # HEAD answers and 1xx/204/304 statuses never carry a body,
+                # whatever Content-Length they declare
+                has_body = (response.request.method != 'HEAD' and response.status_code >= 200
+                            and response.status_code not in (204, 304))
+                
+                if not has_body:
+                    data = b""
+                    max_attempts = POST_MAX_ATTEMPTS
+                elif declared is not None and declared <= RESPONSE_CHUNK_BYTES:
+                    # Small bodies are sent whole, which keeps the POST replayable
+                    try:
+                        data = response.content
+                    except requests.RequestException as e:
+                        raise _IncompleteBody(f"local body failed: {e}") from e
+                    sent = len(data)
+                    max_attempts = POST_MAX_ATTEMPTS
+                elif (declared is not None and declared <= MAX_RESPONSE_BYTES
+                        and 'Content-Encoding' not in response.headers):
+                    # The length on the wire is known, so send it as Content-Length
+                    # rather than chunked transfer encoding. A streamed body can't be
+                    # replayed, so this POST gets a single attempt.
+                    data = _SizedBody(body(declared), declared)
+                    max_attempts = 1
+                else:
+                    data = body()
+                    max_attempts = 1
+                
+                # Send response back to keuka.org with timeout
+                self._post_response(
+                    data,
+                    headers={
+                        'X-Request-ID': request_id,
+                        'X-Response-Status': str(response.status_code),
+                        'X-Response-Headers': json.dumps(response_headers)
+                    },
+                    timeout=25,  # Reduced timeout for better reliability
+                    max_attempts=max_attempts
+                )
             
-            # Limit response size to prevent tunnel overload
-            content = response.content
-            max_content_size = 10 * 1024 * 1024  # 10MB limit
-            if len(content) > max_content_size:
-                logger.warning(f"Response too large ({len(content)} bytes), truncating (ID: {request_id})")
-                content = content[:max_content_size]
-                response_headers['X-Truncated'] = 'true'
+            logger.info(f"Response sent for request {request_id}: {response.status_code} ({sent} bytes)")
             
-            # Send response back to keuka.org with timeout
-            tunnel_response = requests.post(
-                self.response_url,
-                data=content,
-                headers={
-                    'X-Request-ID': request_id,
-                    'X-Response-Status': str(response.status_code),
-                    'X-Response-Headers': json.dumps(response_headers),
-                    'Content-Type': 'application/octet-stream'
-                },
-                timeout=25  # Reduced timeout for better reliability
-            )
-            tunnel_response.raise_for_status()
-            
-            logger.info(f"Response sent for request {request_id}: {response.status_code} ({len(content)} bytes)")
+        except _IncompleteBody as e:
+            # keuka.org never got a complete answer, so it is still waiting on one
+            logger.error(f"Incomplete response for request {request_id}: {e}")
+            self._send_error_response(request_id, "The sensor returned an incomplete response", status_code=502)
             
         except requests.Timeout:
             logger.error(f"Timeout sending response for request {request_id}")
-            # Don't retry - the server-side timeout has probably occurred
             
         except requests.RequestException as e:
             logger.error(f"Network error sending response for request {request_id}: {e}")
@@ -386,32 +625,45 @@ class TunnelClient:
         except Exception as e:
             logger.error(f"Unexpected error sending response for request {request_id}: {e}")
 
-    def _send_error_response(self, request_id, error_message, status_code=500):
+    def _post_response(self, data, headers, timeout, max_attempts=POST_MAX_ATTEMPTS):
+        """POST a response to keuka.org, retrying transient failures with jittered backoff"""
+        delay = POST_RETRY_DELAY_S
+        for attempt in range(1, max_attempts + 1):
+            try:
+                tunnel_response = self._tunnel_session.post(
+                    self.response_url, data=data, headers={**self._post_headers_base, **headers},
+                    timeout=timeout
+                )
+                tunnel_response.raise_for_status()
+                return tunnel_response
+            except (requests.Timeout, requests.ConnectionError) as e:
+                if attempt == max_attempts or not self.running:
+                    raise
+                logger.warning(f"Tunnel response POST failed ({e}), retrying in {delay:.1f}s")
+                self._stop_event.wait(delay + random.random() * 0.25)
+                delay = min(delay * 2, POST_MAX_RETRY_DELAY_S)
+
+    def _send_error_response(self, request_id, error_message, status_code=500,
+                             max_attempts=POST_MAX_ATTEMPTS):
         """Send error response back through the tunnel"""
         try:
-            error_html = f"""
-            <html>
-                <body>
-                    <h1>Sensor Error ({status_code})</h1>
-                    <p>The sensor encountered an error processing your request:</p>
-                    <p><strong>{error_message}</strong></p>
-                    <p><small>Request ID: {request_id}</small></p>
-                </body>
-            </html>
-            """
+            # Messages can carry exception text and request paths; escape before embedding
+            error_html = _ERROR_HTML % (
+                status_code,
+                html.escape(str(error_message)).encode('utf-8'),
+                html.escape(str(request_id)).encode('utf-8'),
+            )
             
-            tunnel_response = requests.post(
-                self.response_url,
-                data=error_html.encode('utf-8'),
+            self._post_response(
+                error_html,
                 headers={
                     'X-Request-ID': request_id,
                     'X-Response-Status': str(status_code),
-                    'X-Response-Headers': json.dumps({'Content-Type': 'text/html'}),
-                    'Content-Type': 'application/octet-stream'
+                    'X-Response-Headers': _ERROR_HEADERS_JSON
                 },
-                timeout=15  # Shorter timeout for error responses
+                timeout=15,  # Shorter timeout for error responses
+                max_attempts=max_attempts
             )
-            tunnel_response.raise_for_status()
             logger.debug(f"Error response sent for request {request_id}: {status_code}")
             
         except requests.Timeout:
@@ -422,37 +674,46 @@ class TunnelClient:
             logger.error(f"Failed to send error response for request {request_id}: {e}")
 
 
-# Global tunnel client instance
+# Global tunnel client instance; _tunnel_lock makes start/stop atomic so
+# concurrent callers (e.g. the reloader and app startup) can't start two
 _tunnel_client = None
+_tunnel_lock = threading.Lock()
 
 def start_tunnel():
     """Start the tunnel client (call this from your main app)"""
     global _tunnel_client
-    if _tunnel_client is None:
+    with _tunnel_lock:
+        if _tunnel_client is not None and _tunnel_client.running:
+            return False
+        if _tunnel_client is not None:
+            # A previous client that has stopped; release its pool and sessions
+            _tunnel_client.stop()
         _tunnel_client = TunnelClient()
         _tunnel_client.start()
         return True
-    return False
 
 def stop_tunnel():
     """Stop the tunnel client"""
     global _tunnel_client
-    if _tunnel_client:
-        _tunnel_client.stop()
-        _tunnel_client = None
+    with _tunnel_lock:
+        client, _tunnel_client = _tunnel_client, None
+    if client:
+        client.stop()
 
 def is_tunnel_running():
     """Check if tunnel is running"""
-    return _tunnel_client is not None and _tunnel_client.running
+    client = _tunnel_client
+    return client is not None and client.running
 
 if __name__ == "__main__":
     # For testing - run standalone
     logging.basicConfig(level=logging.INFO)
     client = TunnelClient()
-    try:
-        client.start()
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        print("\nStopping tunnel client...")
-        client.stop()
\ No newline at end of file
+    stop_event = threading.Event()
+    # Block until Ctrl-C / SIGTERM instead of waking every second
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    client.start()
+    stop_event.wait()
+    print("\nStopping tunnel client...")
+    client.stop()
\ No newline at end of file
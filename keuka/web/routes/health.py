@@ -7,16 +7,24 @@
 # -----------------------------------------------------------------------------
 
 from __future__ import annotations
+import gzip
 import json
+import os
+import queue
 import time
+import hashlib
 import re
+import logging
+import math
+import socket
+import threading
+import zlib
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Dict, Any, Union, Tuple, Generator
+from typing import Dict, Any, Optional, Union, Tuple, Generator, Set
 from flask import Blueprint, Response, request
 from ..common import api_route, ApiError, validate_json_request
 
-from ...ui import render_page
+from ...ui import render_static_page
 from ...core.utils import utcnow_str, read_text
 from ...config import (
     APP_DIR,
@@ -26,11 +34,27 @@ from ...config import (
 )
 from ...camera import camera
 from ...sensors import read_temp_fahrenheit, median_distance_inches, read_gps_lat_lon_elev
-from ...wifi_net import wifi_status, ip_addr4, gw4, dns_servers
+from ...wifi_net import wifi_status, ip_addrs4, gw4, dns_servers
 from ...system_diag import cpu_temp_c, uptime_seconds, disk_usage_root, mem_usage
 from ...core.log_reader import log_reader
 
+try:
+    import orjson  # optional: several times faster than stdlib json on the Pi
+except ImportError:
+    orjson = None
+
 health_bp = Blueprint("health", __name__)
+logger = logging.getLogger(__name__)
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize a payload to UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+# Hostname is effectively constant for the life of the process (renames go
+# through a service restart), so resolve it once instead of forking per build.
+_HOSTNAME = socket.gethostname()
 
 # ---- contact persistence (file: contact.txt in APP_DIR) ----------------------
 CONTACT_FILE = APP_DIR / "contact.txt"
@@ -38,7 +62,17 @@ CONTACT_FILE = APP_DIR / "contact.txt"
 def _contact_defaults() -> dict:
     return {"name": "", "address": "", "phone": "", "email": "", "notes": ""}
 
+# Contact info only changes through contact_set(), so keep the parsed copy in
+# memory instead of re-reading contact.txt on every payload build.
+_contact_cache: Optional[dict] = None
+_contact_lock = threading.Lock()
+_contact_dir_ready = False  # parent dir created at most once per process
+
 def contact_get() -> dict:
+    global _contact_cache
+    with _contact_lock:
+        if _contact_cache is not None:
+            return dict(_contact_cache)
     try:
         txt = CONTACT_FILE.read_text(encoding="utf-8")
         data = json.loads(txt) if txt.strip() else {}
@@ -52,9 +86,12 @@ def contact_get() -> dict:
             out[k] = str(v) if v is not None else ""
         except Exception:
             out[k] = ""
+    with _contact_lock:
+        _contact_cache = dict(out)
     return out
 
 def contact_set(info: Dict[str, Any]) -> None:
+    global _contact_cache, _contact_dir_ready
     def _s(val: object, maxlen: int) -> str:
         try:
             s = str(val) if val is not None else ""
@@ -71,72 +108,233 @@ def contact_set(info: Dict[str, Any]) -> None:
         "notes":   _s(info.get("notes"),   5000),
     }
 
+    data = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
     try:
-        CONTACT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        if not _contact_dir_ready:
+            CONTACT_FILE.parent.mkdir(parents=True, exist_ok=True)
+            _contact_dir_ready = True
         tmp = CONTACT_FILE.with_suffix(".tmp")
-        
-        # Write with explicit flush and sync to prevent hanging
-        with tmp.open('w', encoding='utf-8') as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
-            f.flush()  # Ensure data is written to OS buffers
-            import os
-            os.fsync(f.fileno())  # Force write to disk
-        
-        tmp.replace(CONTACT_FILE)  # atomic on POSIX
-        
+
+        # One write + fsync on a raw fd, then an atomic rename
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)  # Force write to disk
+        finally:
+            os.close(fd)
+
+        os.replace(tmp, CONTACT_FILE)  # atomic on POSIX
+        with _contact_lock:
+            _contact_cache = dict(payload)
+
     except OSError as e:
         # Log but don't fail completely - contact updates shouldn't kill the app
-        import logging
-        logging.error(f"Failed to save contact info to {CONTACT_FILE}: {e}")
+        logger.error(f"Failed to save contact info to {CONTACT_FILE}: {e}")
         raise  # Re-raise so the API can return appropriate error
 
+# hostapd.conf only changes when an admin edits it, so the parse is cached
+# against the file's mtime and redone in a single regex pass when it moves.
+_HOSTAPD_RE = re.compile(r"^\s*(ssid|channel|hw_mode)\s*=\s*(.+?)\s*$", re.M)
+_hostapd_cache: Dict[str, Any] = {"path": None, "mtime": None, "data": None}
+
 def hostapd_info(conf_path: str = "/etc/hostapd/hostapd.conf") -> Dict[str, Any]:
     """Best-effort parse of hostapd.conf so we can show AP SSID/channel."""
     try:
-        txt = read_text(Path(conf_path))
-    except Exception:
-        return {"ssid": None, "channel": None, "hw_mode": None}
-    def get(k):
-        m = re.search(rf"^\s*{re.escape(k)}\s*=\s*(.+)\s*$", txt, re.M)
-        return m.group(1).strip() if m else None
+        mtime = os.stat(conf_path).st_mtime_ns
+    except OSError:
+        mtime = None
+    if (_hostapd_cache["data"] is not None and _hostapd_cache["path"] == conf_path
+            and _hostapd_cache["mtime"] == mtime):
+        return dict(_hostapd_cache["data"])
+
+    info: Dict[str, Any] = {"ssid": None, "channel": None, "hw_mode": None}
+    if mtime is not None:
+        for key, val in _HOSTAPD_RE.findall(read_text(Path(conf_path))):
+            if info[key] is None:  # first occurrence wins, as with re.search
+                info[key] = val
+    _hostapd_cache.update(path=conf_path, mtime=mtime, data=info)
+    return dict(info)
+
+# -------- Display strings --------
+# The dashboard shows these verbatim (element id -> text), so formatting is
+# done once per payload build instead of in every open browser tab.
+_NA = "(n/a)"
+
+def _fmt(v: Any, spec: str = "", fallback: str = _NA) -> str:
+    if v is None or v == "":
+        return fallback
+    try:
+        return format(v, spec)
+    except (TypeError, ValueError):
+        return str(v)
+
+def _fmt_bytes(n: Any) -> str:
+    """Human-readable byte count (B/KB/MB/...), 1024-based."""
+    try:
+        n = float(n or 0)
+    except (TypeError, ValueError):
+        return _NA
+    if n <= 0:
+        return "0 B"
+    units = ("B", "KB", "MB", "GB", "TB", "PB")
+    i = min(int(math.log(n, 1024)), len(units) - 1)
+    return f"{n / 1024 ** i:.{1 if i else 0}f} {units[i]}"
+
+def _fmt_uptime(sec: Any) -> str:
+    """Uptime as 'Xd Yh Zm' (days omitted when zero)."""
+    s = int(sec or 0)
+    d, s = divmod(s, 86400)
+    h, s = divmod(s, 3600)
+    m = s // 60
+    return (f"{d}d " if d else "") + f"{h}h {m}m"
+
+def _fmt_lat_lon_hem(v: Any, is_lat: bool) -> str:
+    if not isinstance(v, (int, float)) or not math.isfinite(v):
+        return _NA
+    hem = ("N" if v >= 0 else "S") if is_lat else ("E" if v >= 0 else "W")
+    return f"{abs(v):.6f} {hem}"
+
+def _build_display(p: Dict[str, Any]) -> Dict[str, str]:
+    """Pre-format payload values for the dashboard, keyed by element id."""
+    gps = p.get("gps") or {}
+    cam = (p.get("camera") or {}).get("buffer_stats") or {}
+    st = p.get("wifi_sta") or {}
+    ap = p.get("wifi_ap") or {}
+    ip = p.get("ip") or {}
+    sys_ = p.get("system") or {}
+    disk = sys_.get("disk") or {}
+    mem = sys_.get("mem") or {}
+    frame_age = cam.get("last_frame_age")
     return {
-        "ssid": get("ssid"),
-        "channel": get("channel"),
-        "hw_mode": get("hw_mode"),
+        "sta_if": _fmt(WLAN_STA_IFACE),
+        "ap_if": _fmt(WLAN_AP_IFACE),
+        "tempF": _fmt(p.get("tempF"), ".2f"),
+        "distanceInches": _fmt(p.get("distanceInches"), ".2f"),
+        "turbidityNTU": _fmt(p.get("turbidityNTU"), ".2f"),
+        "bufferSize": _fmt(cam.get("buffer_size"), "", "0"),
+        "maxBuffer": _fmt(cam.get("max_buffer_size"), "", "0"),
+        "frameAge": f"{frame_age:.1f}" if isinstance(frame_age, (int, float)) and math.isfinite(frame_age) else "∞",
+        "gpsLat": _fmt_lat_lon_hem(gps.get("lat"), True),
+        "gpsLon": _fmt_lat_lon_hem(gps.get("lon"), False),
+        "gpsElevFt": _fmt(gps.get("elevation_ft"), ".1f"),
+        "ssid": st.get("ssid") or "Not connected",
+        "freq": _fmt(st.get("freq_mhz")),
+        "bssid": _fmt(st.get("bssid")),
+        "ap_ssid": _fmt(ap.get("ssid")),
+        "ap_chan": _fmt(ap.get("channel")),
+        "ap_mode": _fmt(ap.get("hw_mode")),
+        "ip_sta": _fmt(ip.get(WLAN_STA_IFACE)),
+        "ip_ap": _fmt(ip.get(WLAN_AP_IFACE)),
+        "gw_sta": _fmt(p.get("gateway_sta")),
+        "gw_ap": _fmt(p.get("gateway_ap")),
+        "dns": ", ".join(p.get("dns") or []) or _NA,
+        "hostname": _fmt(sys_.get("hostname")),
+        "cpuTemp": _fmt(sys_.get("cpu_temp_c"), ".1f"),
+        "cpuUtil": _fmt(sys_.get("cpu_util_pct"), ".1f"),
+        "uptime": _fmt_uptime(sys_.get("uptime_seconds")),
+        "diskPct": _fmt(disk.get("percent"), ".1f"),
+        "diskSizes": f"{_fmt_bytes(disk.get('used'))} / {_fmt_bytes(disk.get('total'))}",
+        "memPct": _fmt(mem.get("percent"), ".1f"),
+        "memTotal": _fmt_bytes(mem.get("total")),
+        "memUsed": _fmt_bytes(mem.get("used")),
+        "memFree": _fmt_bytes(mem.get("free")),
     }
 
+# -------- CPU utilization sampler --------
+# A single module-wide /proc/stat baseline. Concurrent payload builds used to
+# overwrite each other's previous sample and produce near-zero deltas; now the
+# baseline only advances at most once per CPU_SAMPLE_MIN_S and every caller
+# reads the last computed value.
+CPU_SAMPLE_MIN_S = 1.0
+_cpu_lock = threading.Lock()
+_CPU_STATE: Dict[str, Any] = {"idle": 0, "total": 0, "util": None, "ts": 0.0, "fd": None}
+
+def _read_proc_stat_cpu() -> list:
+    """First 8 counters of the aggregate "cpu" line of /proc/stat.
+
+    The fd is opened once and re-read with pread at offset 0, which makes
+    procfs regenerate the file without a fresh open/close per sample.
+    Caller must hold _cpu_lock.
+    """
+    fd = _CPU_STATE["fd"]
+    if fd is None:
+        fd = _CPU_STATE["fd"] = os.open("/proc/stat", os.O_RDONLY)
+    try:
+        buf = os.pread(fd, 512, 0)
+    except OSError:
+        os.close(fd)
+        _CPU_STATE["fd"] = None
+        raise
+    end = buf.find(b"\n")
+    line = buf if end < 0 else buf[:end]
+    return [int(x) for x in line.split()[1:9]]
+
+def _sample_cpu_util() -> Optional[float]:
+    with _cpu_lock:
+        now = time.monotonic()
+        if now - _CPU_STATE["ts"] < CPU_SAMPLE_MIN_S:
+            return _CPU_STATE["util"]
+        try:
+            nums = _read_proc_stat_cpu()
+        except Exception:
+            return _CPU_STATE["util"]
+        idle = nums[3] + nums[4]
+        total = sum(nums)
+        if _CPU_STATE["ts"]:
+            idle_d = idle - _CPU_STATE["idle"]
+            total_d = total - _CPU_STATE["total"]
+            if total_d > 0:
+                _CPU_STATE["util"] = round((1.0 - (idle_d / total_d)) * 100.0, 1)
+        _CPU_STATE.update(idle=idle, total=total, ts=now)
+        return _CPU_STATE["util"]
+
 # -------- Shared payload builder --------
 # Simple cache to avoid re-reading sensors too frequently
 _health_cache = {"data": None, "timestamp": 0, "fast_mode": None}
 _cache_ttl_seconds = 1.5  # Cache valid for 1.5 seconds
+_health_cache_lock = threading.Lock()  # keeps data/timestamp/fast_mode consistent
+
+# Boot time doesn't move, so format it once from the first good uptime read
+_boot_utc: Dict[str, Optional[str]] = {"value": None}
+
+def _boot_time_utc(up_s: float) -> str:
+    cached = _boot_utc["value"]
+    if cached is not None:
+        return cached
+    value = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(time.time() - up_s))
+    if up_s > 0:  # uptime_seconds() returns 0.0 when /proc/uptime is unreadable
+        _boot_utc["value"] = value
+    return value
+
+def _rnd(v: Optional[float], ndigits: int) -> Optional[float]:
+    """Round a sensor reading, mapping missing (None/NaN) readings to None."""
+    return None if v is None or math.isnan(v) else round(v, ndigits)
 
 def build_health_payload(fast_mode: bool = False) -> Dict[str, Any]:
     # Check cache first
     current_time = time.time()
-    if (_health_cache["data"] is not None and 
-        current_time - _health_cache["timestamp"] < _cache_ttl_seconds and
-        _health_cache["fast_mode"] == fast_mode):
-        return _health_cache["data"].copy()  # Return cached copy
+    with _health_cache_lock:
+        if (_health_cache["data"] is not None and
+            current_time - _health_cache["timestamp"] < _cache_ttl_seconds and
+            _health_cache["fast_mode"] == fast_mode):
+            return _health_cache["data"].copy()  # Return cached copy
     # Sensor readings (gracefully handle missing hardware)
     # Use optimized parameters for faster loading if requested
-    if fast_mode:
-        # Optimized for web page loading - reduced timeouts and samples
-        tF = read_temp_fahrenheit()  # Already has reasonable retry logic
-        dIn = median_distance_inches(samples=5)  # Reduce from 11 to 5 samples
-        turbidity = None  # Placeholder for future turbidity sensor (not yet implemented)
+    tF = read_temp_fahrenheit()  # Reuses a reading younger than temperature.TEMP_TTL_S
+    # Fast mode (web page loading) takes 5 samples instead of 11
+    dIn = median_distance_inches(samples=5) if fast_mode else median_distance_inches()
+    turbidity = None  # Placeholder for future turbidity sensor (not yet implemented)
 
+    # GPS (lat, lon in degrees; alt in meters) -> convert elevation to feet
+    if fast_mode:
         # GPS with reduced timeout for web requests
         lat, lon, alt_m = read_gps_lat_lon_elev(duration_s=0.5)  # Reduce from 2.0s to 0.5s
-        elev_ft = alt_m * 3.28084 if not (alt_m != alt_m) else float('nan')  # NaN check
     else:
         # Normal mode with full timeouts for background updates
-        tF = read_temp_fahrenheit()
-        dIn = median_distance_inches()
-        turbidity = None  # Placeholder for future turbidity sensor (not yet implemented)
-
-        # GPS (lat, lon in degrees; alt in meters) -> convert elevation to feet
         lat, lon, alt_m = read_gps_lat_lon_elev()
-        elev_ft = alt_m * 3.28084 if not (alt_m != alt_m) else float('nan')  # NaN check
+    elev_ft = alt_m * 3.28084  # NaN propagates
 
     # Wi-Fi
     st = wifi_status() or {}               # STA link info (on WLAN_STA_IFACE)
@@ -146,42 +344,23 @@ def build_health_payload(fast_mode: bool = False) -> Dict[str, Any]:
     cpu_c = cpu_temp_c()
     up_s = uptime_seconds()
 
-    # CPU utilization from /proc/stat deltas
-    cpu_util = None
-    try:
-        with open("/proc/stat", "r") as f:
-            parts = f.readline().split()[1:]
-        nums = list(map(int, parts[:8]))
-        idle = nums[3] + nums[4]
-        total = sum(nums)
-        prev = getattr(build_health_payload, "_prev_stat", None)
-        if prev is not None:
-            idle_d = idle - prev[0]
-            total_d = total - prev[1]
-            if total_d > 0:
-                cpu_util = round((1.0 - (idle_d / total_d)) * 100.0, 1)
-        build_health_payload._prev_stat = (idle, total)
-    except Exception:
-        pass
+    # CPU utilization from /proc/stat deltas (shared sampler)
+    cpu_util = _sample_cpu_util()
 
-    boot_utc = (datetime.utcnow() - timedelta(seconds=up_s)).strftime("%Y-%m-%d %H:%M:%S")
+    boot_utc = _boot_time_utc(up_s)
 
-    # IPs per interface
-    ip_map = {}
-    for iface in (WLAN_STA_IFACE, WLAN_AP_IFACE):
-        val = ip_addr4(iface)
-        if val:
-            ip_map[iface] = val
+    # IPs per interface (one `ip` call for both)
+    ip_map = {iface: val for iface, val in ip_addrs4((WLAN_STA_IFACE, WLAN_AP_IFACE)).items() if val}
 
     result = {
         "time_utc": utcnow_str(),
-        "tempF": None if (tF != tF) else round(tF, 2),
-        "distanceInches": None if (dIn != dIn) else round(dIn, 2),
-        "turbidityNTU": None if (turbidity is None or turbidity != turbidity) else round(turbidity, 2),
+        "tempF": _rnd(tF, 2),
+        "distanceInches": _rnd(dIn, 2),
+        "turbidityNTU": _rnd(turbidity, 2),
         "gps": {
-            "lat": None if (lat != lat) else round(lat, 6),
-            "lon": None if (lon != lon) else round(lon, 6),
-            "elevation_ft": None if (elev_ft != elev_ft) else round(elev_ft, 1),
+            "lat": _rnd(lat, 6),
+            "lon": _rnd(lon, 6),
+            "elevation_ft": _rnd(elev_ft, 1),
         },
         "camera": {
             "status": "running" if camera.running else "idle",
@@ -198,13 +377,13 @@ def build_health_payload(fast_mode: bool = False) -> Dict[str, Any]:
         "app": "keuka-sensor",
         "version": VERSION,
         "system": {
-            "cpu_temp_c": None if (cpu_c != cpu_c) else round(cpu_c, 1),
+            "cpu_temp_c": _rnd(cpu_c, 1),
             "cpu_util_pct": cpu_util,
             "uptime_seconds": int(up_s),
             "boot_time_utc": boot_utc,
             "disk": disk_usage_root(),
             "mem": mem_usage(),
-            "hostname": __import__("subprocess").getoutput("hostname"),
+            "hostname": _HOSTNAME,
         },
         "thresholds": {
             "temp_warn_f": TEMP_WARN_F,
@@ -216,22 +395,21 @@ def build_health_payload(fast_mode: bool = False) -> Dict[str, Any]:
         },
         "contact": contact_get(),
     }
+    result["display"] = _build_display(result)
     
     # Update cache
-    _health_cache["data"] = result.copy()
-    _health_cache["timestamp"] = current_time
-    _health_cache["fast_mode"] = fast_mode
+    with _health_cache_lock:
+        _health_cache["data"] = result.copy()
+        _health_cache["timestamp"] = current_time
+        _health_cache["fast_mode"] = fast_mode
     
     return result
 
 # -------- HTML dashboard --------
-@health_bp.route("/health")
-@api_route
-def health() -> str:
-    # Use fast mode for initial page load to reduce loading time
-    info = build_health_payload(fast_mode=True)
-    extra_head = f"""
-    <script id="seed" type="application/json">{json.dumps(info)}</script>
+# The page is constant apart from the seed payload, so build it once at import.
+# Per request we only substitute the {SEED_JSON} placeholder.
+_HEALTH_EXTRA_HEAD = """
+    <script id="seed" type="application/json">{SEED_JSON}</script>
     <!-- Leaflet map (client-side; no Python deps) -->
     <link
       rel="stylesheet"
@@ -245,11 +423,12 @@ def health() -> str:
       crossorigin=""
     ></script>
     <style>
-      #map {{ height: 220px; width: 100%; border-radius: 8px; }}
+      #map { height: 220px; width: 100%; border-radius: 8px; }
     </style>
     """
-    # NOTE: This is an f-string. ALL JS braces are doubled {{ }} to avoid f-string parsing.
-    body = f"""
+
+# NOTE: This is an f-string. ALL JS braces are doubled {{ }} to avoid f-string parsing.
+_HEALTH_BODY = f"""
       <div class="flex" style="gap:.8rem;align-items:center;margin-bottom:.3rem">
         <h1 style="margin:0">Health</h1>
         <span id="connDot" class="dot" title="connection status"></span>
@@ -324,7 +503,7 @@ def health() -> str:
             <tr><th>Frame Age</th><td><span id="frameAge"></span>s</td></tr>
           </table>
           <a href="/webcam" title="Open live stream">
-            <img id="thumb" class="thumb" src="/snapshot?cb=0" alt="Webcam snapshot (click to open)" onerror="this.style.display='none'">
+            <img id="thumb" class="thumb" src="/snapshot" alt="Webcam snapshot (click to open)" onerror="this.style.display='none'">
           </a>
           <div class="muted" style="margin-top:.4rem">Click thumbnail to open live stream.</div>
         </div>
@@ -438,20 +617,6 @@ def health() -> str:
 
       <script>
         // ---- helpers ----
-        function fmtLatLonHem(d, isLat) {{
-          if (d===null || d===undefined || d==="") return "(n/a)";
-          const v = Number(d);
-          if (!isFinite(v)) return "(n/a)";
-          const dir = isLat ? (v >= 0 ? "N" : "S") : (v >= 0 ? "E" : "W");
-          const abs = Math.abs(v).toFixed(6);
-          return abs + " " + dir;
-        }}
-        function fmt(v, fallback="(n/a)") {{ return (v===null||v===undefined||v==="") ? fallback : v; }}
-        function bytes(n) {{
-          if (n===0) return "0 B";
-          const u=["B","KB","MB","GB","TB","PB"]; let i = Math.floor(Math.log(n)/Math.log(1024));
-          return (n/Math.pow(1024,i)).toFixed(i?1:0)+" "+u[i];
-        }}
         function setBadge(el, level, text) {{
           el.className = "badge " + (level ? "b-"+level : "");
           el.textContent = text || "";
@@ -464,14 +629,6 @@ def health() -> str:
           const spans = Array.from({{length:5}}, (_,i)=>`<span class="${{i<bars?"on":""}}" style="height:${{4+i*2}}px"></span>`).join("");
           return `<span class="bars" title="${{v}} dBm">${{spans}}</span><span class="muted"> ${{v}} dBm</span>`;
         }}
-        function humanUptimeDHMS(sec) {{
-          let s = Number(sec);
-          const d=Math.floor(s/86400); s-=d*86400;
-          const h=Math.floor(s/3600); s-=h*3600;
-          const m=Math.floor(s/60);
-          const parts=[]; if (d) parts.push(d+"d"); parts.push(h+"h"); parts.push(m+"m");
-          return parts.join(" ");
-        }}
         let prev = {{}};
         function upDownFlash(el, key, newVal) {{
           const was = prev[key]; prev[key] = newVal;
@@ -480,16 +637,38 @@ def health() -> str:
           if (n > w) {{ el.classList.remove("downflash"); void el.offsetWidth; el.classList.add("upflash"); }}
           else if (n < w) {{ el.classList.remove("upflash"); void el.offsetWidth; el.classList.add("downflash"); }}
         }}
+        // Raw JSON panel: pretty-printing the payload is only worth doing while
+        // the panel is on screen (or on Copy), not on every tick.
+        let lastData = null;
+        let rawDirty = false;
+        let rawVisible = !window.IntersectionObserver;  // no observer: always render
+        function renderRaw() {{
+          if (!lastData) return "";
+          const txt = JSON.stringify(lastData, null, 2);
+          document.getElementById('rawjson').textContent = txt;
+          rawDirty = false;
+          return txt;
+        }}
+        if (window.IntersectionObserver) {{
+          new IntersectionObserver((entries) => {{
+            rawVisible = entries.some(e => e.isIntersecting);
+            if (rawVisible && rawDirty) renderRaw();
+          }}).observe(document.getElementById('rawjson'));
+        }}
         function copyJSON() {{
-          const pre = document.getElementById('rawjson');
-          navigator.clipboard.writeText(pre.textContent).then(()=>{{
+          navigator.clipboard.writeText(renderRaw()).then(()=>{{
             const n = document.getElementById('copynote'); n.textContent = "Copied!";
             setTimeout(()=> n.textContent="", 1200);
           }});
         }}
+        // Element lookups are memoized: render() runs on every SSE tick and
+        // tickAgo() every second, and the elements never change.
+        const E = {{}};
+        function byId(id) {{ return E[id] || (E[id] = document.getElementById(id)); }}
+
         let lastUpdateEpoch = 0;
         function tickAgo() {{
-          const el = document.getElementById('lastUpdated');
+          const el = byId('lastUpdated');
           if (!lastUpdateEpoch) {{ el.textContent = "—"; return; }}
           const secs = Math.round((Date.now() - lastUpdateEpoch)/1000);
           el.textContent = "Updated " + (secs===0 ? "just now" : secs + "s ago");
@@ -518,26 +697,27 @@ def health() -> str:
 
         // ---- contact form helpers ----
         let contactInitialized = false; // Only set fields on first load or after Save
+        let lastThumbSeq = null;        // camera frame_seq currently shown in the thumbnail
 
         function setContactForm(c) {{
-          document.getElementById('c_name').value = c?.name || "";
-          document.getElementById('c_address').value = c?.address || "";
-          document.getElementById('c_phone').value = c?.phone || "";
-          document.getElementById('c_email').value = c?.email || "";
-          document.getElementById('c_notes').value = c?.notes || "";
+          byId('c_name').value = c?.name || "";
+          byId('c_address').value = c?.address || "";
+          byId('c_phone').value = c?.phone || "";
+          byId('c_email').value = c?.email || "";
+          byId('c_notes').value = c?.notes || "";
         }}
         async function saveContact(e) {{
           e.preventDefault();
-          const btn = document.getElementById('c_save');
-          const status = document.getElementById('c_status');
+          const btn = byId('c_save');
+          const status = byId('c_status');
           btn.disabled = true; status.textContent = "Saving...";
           try {{
             const payload = {{
-              name: document.getElementById('c_name').value,
-              address: document.getElementById('c_address').value,
-              phone: document.getElementById('c_phone').value,
-              email: document.getElementById('c_email').value,
-              notes: document.getElementById('c_notes').value,
+              name: byId('c_name').value,
+              address: byId('c_address').value,
+              phone: byId('c_phone').value,
+              email: byId('c_email').value,
+              notes: byId('c_notes').value,
             }};
             const r = await fetch((window.getProxyAwareUrl || (p => p))('/health/contact'), {{
               method: 'POST',
@@ -565,49 +745,33 @@ def health() -> str:
         function render(data) {{
           // show server time in local browser time
           const dt = new Date(String(data.time_utc).replace(' ', 'T') + 'Z');
-          document.getElementById('localTime').textContent = dt.toLocaleString();
+          byId('localTime').textContent = dt.toLocaleString();
 
-          document.getElementById('rawjson').textContent = JSON.stringify(data, null, 2);
+          lastData = data; rawDirty = true;
+          if (rawVisible) renderRaw();
 
-          // Label the interface names
-          document.getElementById('sta_if').textContent = data.ifaces?.sta || "(n/a)";
-          document.getElementById('ap_if').textContent  = data.ifaces?.ap  || "(n/a)";
+          // Pre-formatted strings from the server: one textContent write per field
+          const disp = data.display || {{}};
+          for (const id in disp) {{
+            const el = byId(id);
+            if (el) el.textContent = disp[id];
+          }}
 
           // Environment
-          const tempEl = document.getElementById('tempF');
-          tempEl.textContent = fmt(data.tempF);
-          upDownFlash(tempEl, "tempF", data.tempF);
-
-          const distEl = document.getElementById('distanceInches');
-          distEl.textContent = fmt(data.distanceInches);
-          upDownFlash(distEl, "distanceInches", data.distanceInches);
+          upDownFlash(byId('tempF'), "tempF", data.tempF);
+          upDownFlash(byId('distanceInches'), "distanceInches", data.distanceInches);
+          upDownFlash(byId('turbidityNTU'), "turbidityNTU", data.turbidityNTU);
 
-          const turbidityEl = document.getElementById('turbidityNTU');
-          turbidityEl.textContent = fmt(data.turbidityNTU);
-          upDownFlash(turbidityEl, "turbidityNTU", data.turbidityNTU);
-
-          const camBadge = document.getElementById('cameraBadge');
+          const camBadge = byId('cameraBadge');
           const camData = data.camera || {{}};
           const isRunning = camData.status === "running" && camData.available;
           setBadge(camBadge, (isRunning ? "ok" : "idle"), (isRunning ? "Running" : "Idle"));
-          
-          // Update camera buffer stats
-          const bufStats = camData.buffer_stats || {{}};
-          document.getElementById('bufferSize').textContent = fmt(bufStats.buffer_size, "0");
-          document.getElementById('maxBuffer').textContent = fmt(bufStats.max_buffer_size, "0");
-          document.getElementById('frameAge').textContent = 
-            (bufStats.last_frame_age !== undefined && isFinite(bufStats.last_frame_age)) 
-            ? bufStats.last_frame_age.toFixed(1) 
-            : "∞";
 
           // GPS (now in Location section)
           const gps = data.gps || {{}};
-          document.getElementById('gpsLat').textContent = fmtLatLonHem(gps.lat, true);
-          document.getElementById('gpsLon').textContent = fmtLatLonHem(gps.lon, false);
-          document.getElementById('gpsElevFt').textContent = fmt(gps.elevation_ft);
           const hasLat = (typeof gps.lat === 'number') && isFinite(gps.lat);
           const hasLon = (typeof gps.lon === 'number') && isFinite(gps.lon);
-          const noteEl = document.getElementById('mapNote');
+          const noteEl = byId('mapNote');
 
           if (hasLat && hasLon) {{
             updateMap(gps.lat, gps.lon);
@@ -619,37 +783,14 @@ def health() -> str:
 
           // Wi-Fi (STA)
           const ws = data.wifi_sta || {{}};
-          const ssid = ws.ssid || null;
-          document.getElementById('ssid').textContent = ssid || "Not connected";
-          document.getElementById('freq').textContent = fmt(ws.freq_mhz);
-          document.getElementById('bssid').textContent = fmt(ws.bssid);
           const rssi = ws.signal_dbm;
-          document.getElementById('rssiBars').innerHTML = rssiBarsHTML(rssi);
-          upDownFlash(document.getElementById('rssiBars'), "rssi", rssi);
-          const wifiStatus = document.getElementById('wifiStatus');
-          setBadge(wifiStatus, ssid ? "ok" : "warn", ssid ? "Connected" : "Not connected");
-
-          // Wi-Fi (AP)
-          const ap = data.wifi_ap || {{}};
-          document.getElementById('ap_ssid').textContent = fmt(ap.ssid);
-          document.getElementById('ap_chan').textContent = fmt(ap.channel);
-          document.getElementById('ap_mode').textContent = fmt(ap.hw_mode);
-
-          // Networking (resolve IPs by iface map)
-          const sta = data.ifaces?.sta;
-          const apif = data.ifaces?.ap;
-          const ip_sta = sta ? data.ip?.[sta] : null;
-          const ip_ap  = apif ? data.ip?.[apif] : null;
-          document.getElementById('ip_sta').textContent = fmt(ip_sta);
-          document.getElementById('ip_ap').textContent  = fmt(ip_ap);
-          document.getElementById('gw_sta').textContent = fmt(data.gateway_sta);
-          document.getElementById('gw_ap').textContent  = fmt(data.gateway_ap);
-          document.getElementById('dns').textContent = (data.dns && data.dns.length) ? data.dns.join(", ") : "(n/a)";
+          byId('rssiBars').innerHTML = rssiBarsHTML(rssi);
+          upDownFlash(byId('rssiBars'), "rssi", rssi);
+          const wifiStatus = byId('wifiStatus');
+          setBadge(wifiStatus, ws.ssid ? "ok" : "warn", ws.ssid ? "Connected" : "Not connected");
 
           // System
-          document.getElementById('hostname').textContent = fmt(data.system.hostname);
-          document.getElementById('cpuTemp').textContent = fmt(data.system.cpu_temp_c);
-          const cpuB = document.getElementById('cpuBadge');
+          const cpuB = byId('cpuBadge');
           let cpuLv = ""; let cpuTx="";
           if (isFinite(data.system.cpu_temp_c)) {{
             if (data.system.cpu_temp_c >= {CPU_TEMP_CRIT_C}) {{ cpuLv="crit"; cpuTx="Hot"; }}
@@ -657,35 +798,23 @@ def health() -> str:
             else {{ cpuLv="ok"; cpuTx="Cool"; }}
           }}
           setBadge(cpuB, cpuLv, cpuTx);
+          upDownFlash(byId('cpuUtil'), "cpuUtil", data.system.cpu_util_pct);
 
-          const cpuUtilEl = document.getElementById('cpuUtil');
-          cpuUtilEl.textContent = (data.system.cpu_util_pct == null) ? "(n/a)" : Number(data.system.cpu_util_pct).toFixed(1);
-          upDownFlash(cpuUtilEl, "cpuUtil", data.system.cpu_util_pct);
-
-          document.getElementById('uptime').textContent = humanUptimeDHMS(data.system.uptime_seconds);
           const bootDt = new Date(String(data.system.boot_time_utc).replace(' ', 'T') + 'Z');
-          document.getElementById('bootLocal').textContent = bootDt.toLocaleString();
-
-          const d = data.system.disk;
-          document.getElementById('diskPct').textContent = fmt(d.percent);
-          document.getElementById('diskSizes').textContent = `${{bytes(d.used)}} / ${{bytes(d.total)}}`;
-
-          const m = data.system.mem;
-          document.getElementById('memPct').textContent = fmt(m.percent);
-          document.getElementById('memTotal').textContent = bytes(m.total||0);
-          document.getElementById('memUsed').textContent  = bytes(m.used||0);
-          document.getElementById('memFree').textContent  = bytes(m.free||0);
+          byId('bootLocal').textContent = bootDt.toLocaleString();
 
           // Smart thumbnail refresh - only update if camera is producing fresh frames
-          const th = document.getElementById('thumb');
+          const th = byId('thumb');
           if (th && th.style.display!=="none") {{
             const bufStats = camData.buffer_stats || {{}};
             const frameAge = bufStats.last_frame_age || Infinity;
             const bufferSize = bufStats.buffer_size || 0;
             
-            // Only refresh thumbnail if we have fresh frames (< 5 seconds old) and active buffer
-            if (frameAge < 5 && bufferSize > 0) {{
-              th.src = (window.getProxyAwareUrl || (p => p))("/snapshot?cb=" + Date.now());
+            // Only refresh thumbnail if we have fresh frames (< 5 seconds old) and active buffer,
+            // and only when the camera has captured a frame we haven't shown yet
+            if (frameAge < 5 && bufferSize > 0 && bufStats.frame_seq !== lastThumbSeq) {{
+              lastThumbSeq = bufStats.frame_seq;
+              th.src = (window.getProxyAwareUrl || (p => p))("/snapshot?seq=" + lastThumbSeq);
             }}
           }}
 
@@ -906,36 +1035,240 @@ def health() -> str:
         loadLogStats();
       </script>
     """
-    return render_page("Keuka Sensor – Health", body, extra_head)
+
+# Encoded bytes on either side of the {SEED_JSON} placeholder plus a digest
+# of the shell, split again only when render_static_page() hands back a newly
+# rendered page.
+_page_shell: Dict[str, Tuple[str, bytes, bytes, bytes]] = {}
+
+def _health_page_shell() -> Tuple[bytes, bytes, bytes]:
+    html = render_static_page("Keuka Sensor – Health", _HEALTH_BODY, _HEALTH_EXTRA_HEAD)
+    entry = _page_shell.get("last")
+    if entry is None or entry[0] is not html:
+        prefix, suffix = html.split("{SEED_JSON}", 1)
+        digest = hashlib.blake2b(html.encode("utf-8"), digest_size=16).digest()
+        entry = (html, prefix.encode("utf-8"), suffix.encode("utf-8"), digest)
+        _page_shell["last"] = entry
+    return entry[1], entry[2], entry[3]
+
+@health_bp.route("/health")
+@api_route
+def health() -> Response:
+    # Reuse the SSE publisher's serialized payload when fresh; otherwise use
+    # fast mode for initial page load to reduce loading time
+    seed = _last_payload_json() or _dumps(build_health_payload(fast_mode=True))
+    # "</" can't appear inside <script>; "<\/" is the same JSON string
+    seed_bytes = seed.replace(b"</", b"<\\/")
+    prefix, suffix, shell_digest = _health_page_shell()
+    # Keyed by the shell so a re-rendered page (new FQDN) changes the ETag too
+    etag = hashlib.blake2b(seed_bytes, digest_size=8, key=shell_digest).hexdigest()
+    if etag in request.if_none_match:
+        return Response(status=304, headers={"ETag": f'"{etag}"'})
+
+    body = prefix + seed_bytes + suffix
+    return Response(
+        body,
+        mimetype="text/html",
+        headers={"Content-Length": str(len(body)), "ETag": f'"{etag}"'},
+        direct_passthrough=True,
+    )
+
+# -------- Shared serialized payload --------
+# Every consumer (SSE publisher, SSE initial frame, /health.json) reads the
+# same serialized payload, so N viewers cost one build per tick rather than N.
+# The SSE publisher refreshes it every SSE_INTERVAL_S; without subscribers it
+# is rebuilt on demand at most once per PAYLOAD_MAX_AGE_S.
+SSE_INTERVAL_S = 5.0
+SSE_KEEPALIVE_S = 15.0
+PAYLOAD_MAX_AGE_S = 2.0
+
+_sse_lock = threading.Lock()
+_build_lock = threading.Lock()
+_sse_subscribers: Set[queue.SimpleQueue] = set()
+_sse_state: Dict[str, Any] = {"payload": None, "ts": 0.0, "built": 0, "thread": None}
+
+def _store_payload(payload: bytes) -> int:
+    """Publish a freshly serialized payload; returns its epoch build time.
+
+    Caller must hold _sse_lock.
+    """
+    _sse_state["payload"] = payload
+    _sse_state["ts"] = time.monotonic()
+    # Last-Modified for /health.json has 1s resolution; two builds in the same
+    # second still get distinct values so If-Modified-Since can't match stale data
+    _sse_state["built"] = max(int(time.time()), _sse_state["built"] + 1)
+    return _sse_state["built"]
+
+def _last_payload_snapshot(max_age_s: float = SSE_INTERVAL_S * 2) -> Optional[Tuple[bytes, int]]:
+    """(serialized payload, epoch build time) if the shared copy is still fresh."""
+    with _sse_lock:
+        if _sse_state["payload"] and time.monotonic() - _sse_state["ts"] < max_age_s:
+            return _sse_state["payload"], _sse_state["built"]
+    return None
+
+def _last_payload_json(max_age_s: float = SSE_INTERVAL_S * 2) -> Optional[bytes]:
+    """Last serialized payload, if it is still fresh."""
+    snap = _last_payload_snapshot(max_age_s)
+    return snap[0] if snap else None
+
+def get_cached_payload(max_age: float = PAYLOAD_MAX_AGE_S) -> Tuple[bytes, int]:
+    """(serialized payload, epoch build time), rebuilding only when stale."""
+    with _sse_lock:
+        if _sse_state["thread"] is not None:
+            # Publisher is ticking; its payload is as fresh as any client sees
+            max_age = max(max_age, SSE_INTERVAL_S * 2)
+    snap = _last_payload_snapshot(max_age)
+    if snap is not None:
+        return snap
+    # One builder at a time; late arrivals reuse what the first one built
+    with _build_lock:
+        snap = _last_payload_snapshot(max_age)
+        if snap is not None:
+            return snap
+        payload = _dumps(build_health_payload())
+        with _sse_lock:
+            return payload, _store_payload(payload)
+
+# -------- Compression --------
+# The payload is a few KB of repetitive JSON, sent every few seconds per
+# client; gzip cuts that by roughly 70% for clients that accept it.
+_gzip_cache: Dict[str, Tuple[bytes, bytes]] = {}
+
+_etag_cache: Dict[str, Tuple[bytes, str]] = {}
+
+def _payload_etag(body: bytes) -> str:
+    """Content hash of the shared payload, computed once per build."""
+    entry = _etag_cache.get("last")
+    if entry is None or entry[0] is not body:
+        entry = (body, hashlib.blake2b(body, digest_size=8).hexdigest())
+        _etag_cache["last"] = entry
+    return entry[1]
+
+def _accepts_gzip() -> bool:
+    return request.accept_encodings["gzip"] > 0
+
+def _gzip_payload(body: bytes) -> bytes:
+    """gzip the shared payload bytes once, however many clients fetch it."""
+    entry = _gzip_cache.get("last")
+    if entry is None or entry[0] is not body:
+        entry = (body, gzip.compress(body, compresslevel=6))
+        _gzip_cache["last"] = entry
+    return entry[1]
 
 # -------- JSON (programmatic/fallback) --------
 @health_bp.route("/health.json")
 @api_route
-def health_json() -> Dict[str, Any]:
-    return build_health_payload()
+def health_json() -> Response:
+    # Shared payload; its content hash (preferred) or build time lets polling
+    # clients revalidate. The ETag is weak so it covers both encodings.
+    body, built = get_cached_payload()
+    etag = _payload_etag(body)
+
+    headers = {"Cache-Control": "max-age=0, must-revalidate", "Vary": "Accept-Encoding",
+               "ETag": f'W/"{etag}"'}
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(etag)
+    else:
+        since = request.if_modified_since
+        not_modified = since is not None and since.timestamp() >= built
+    if not_modified:
+        resp = Response(status=304, headers=headers)
+    elif _accepts_gzip():
+        headers["Content-Encoding"] = "gzip"
+        resp = Response(_gzip_payload(body), mimetype="application/json", headers=headers)
+    else:
+        resp = Response(body, mimetype="application/json", headers=headers)
+    resp.last_modified = built
+    return resp
 
 # -------- Server-Sent Events --------
+# One publisher thread builds the payload every SSE_INTERVAL_S, frames it as
+# SSE bytes once, and fans the same bytes object out to every connected
+# client's queue. Clients that see no new frame within SSE_KEEPALIVE_S emit a
+# keepalive comment instead.
+_SSE_KEEPALIVE_FRAME = b": keepalive\n\n"
+
+def _sse_frame(payload: bytes) -> bytes:
+    return b"event: health\ndata: " + payload + b"\n\n"
+
+def _sse_publisher() -> None:
+    while True:
+        with _sse_lock:
+            if not _sse_subscribers:
+                _sse_state["thread"] = None
+                return
+        try:
+            with _build_lock:
+                payload = _dumps(build_health_payload())
+        except Exception as e:
+            logger.error(f"SSE publisher failed to build health payload: {e}")
+            payload = None
+        if payload is not None:
+            frame = _sse_frame(payload)
+            with _sse_lock:
+                _store_payload(payload)
+                for q in _sse_subscribers:
+                    q.put_nowait(frame)
+        time.sleep(SSE_INTERVAL_S)
+
+def _sse_subscribe(q: queue.SimpleQueue) -> None:
+    with _sse_lock:
+        _sse_subscribers.add(q)
+        if _sse_state["thread"] is None:
+            t = threading.Thread(target=_sse_publisher, name="HealthSSEPublisher", daemon=True)
+            _sse_state["thread"] = t
+            t.start()
+
+def _sse_unsubscribe(q: queue.SimpleQueue) -> None:
+    with _sse_lock:
+        _sse_subscribers.discard(q)
+
 @health_bp.route("/health.sse")
 @api_route
 def health_sse() -> Response:
-    def stream() -> Generator[str, None, None]:
-        # Initial burst
-        yield f"event: health\ndata: {json.dumps(build_health_payload())}\n\n"
-        last_ping = time.time()
-        while True:
-            time.sleep(5)
-            yield f"event: health\ndata: {json.dumps(build_health_payload())}\n\n"
-            # Proxy keepalive comment every ~15s
-            if time.time() - last_ping > 15:
-                yield ": keepalive\n\n"
-                last_ping = time.time()
+    # A gzip stream is stateful, so each connection gets its own compressor;
+    # a sync flush after every frame lets the browser decode it immediately.
+    z = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if _accepts_gzip() else None
+
+    def encode(frame: bytes) -> bytes:
+        if z is None:
+            return frame
+        return z.compress(frame) + z.flush(zlib.Z_SYNC_FLUSH)
+
+    def stream() -> Generator[bytes, None, None]:
+        q: queue.SimpleQueue = queue.SimpleQueue()
+        _sse_subscribe(q)
+        try:
+            # Initial burst: reuse the publisher's last payload when we have one
+            payload, _ = get_cached_payload()
+            yield encode(_sse_frame(payload))
+            while True:
+                try:
+                    frame = q.get(timeout=SSE_KEEPALIVE_S)
+                except queue.Empty:
+                    # Proxy keepalive comment when nothing new arrived
+                    yield encode(_SSE_KEEPALIVE_FRAME)
+                    continue
+                # A slow client only needs the newest frame, not the backlog
+                while True:
+                    try:
+                        frame = q.get_nowait()
+                    except queue.Empty:
+                        break
+                yield encode(frame)
+        finally:
+            # Runs on client disconnect (generator close) so the publisher can idle
+            _sse_unsubscribe(q)
 
     headers = {
         "Content-Type": "text/event-stream",
         "Cache-Control": "no-cache",
         "X-Accel-Buffering": "no",
         "Connection": "keep-alive",
+        "Vary": "Accept-Encoding",
     }
+    if z is not None:
+        headers["Content-Encoding"] = "gzip"
     return Response(stream(), headers=headers)
 
 # -------- Contact info API (persisted to contact.txt) --------
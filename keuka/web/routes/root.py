@@ -8,7 +8,7 @@
 
 from __future__ import annotations
 from flask import Blueprint, make_response, Response
-from ...sensors import read_temp_fahrenheit, median_distance_inches, read_gps_lat_lon_elev
+from ...sensors import read_all
 from ...core.utils import get_system_fqdn
 from ..common import safe_float_conversion, log_request
 
@@ -20,10 +20,8 @@ def root_plaintext() -> Response:
     log_request("debug")
     
     try:
-        # Read sensor data
-        tF = read_temp_fahrenheit()
-        dIn = median_distance_inches()
-        lat, lon, elev_m = read_gps_lat_lon_elev()
+        # Read sensor data (temperature, distance and GPS run concurrently)
+        tF, dIn, (lat, lon, elev_m) = read_all()
         fqdn = get_system_fqdn()
         
         # Convert elevation from meters to feet (1 meter = 3.28084 feet)
@@ -7,19 +7,28 @@
 # -----------------------------------------------------------------------------
 
 from __future__ import annotations
-import time
-from typing import Generator
-from flask import Blueprint, Response
+import hashlib
+from typing import Generator, Tuple
+from flask import Blueprint, Response, request
 from ...camera import camera  # backend-agnostic; produces JPEG bytes
-from ...ui import render_page
+from ...ui import render_static_page
 from ..common import api_route, ApiError
 
 webcam_bp = Blueprint("webcam", __name__)
 
-@webcam_bp.route("/webcam")
-@api_route
-def webcam_page() -> str:
-    body = """
+# (frame bytes, etag) for the last frame served by /snapshot. The camera hands
+# out the same bytes object until it captures a new frame, so an identity check
+# means the digest is computed once per captured frame, not once per request.
+_snapshot_etag: dict[str, Tuple[bytes, str]] = {}
+
+def _frame_etag(frm: bytes) -> str:
+    entry = _snapshot_etag.get("last")
+    if entry is None or entry[0] is not frm:
+        entry = (frm, hashlib.blake2b(frm, digest_size=8).hexdigest())
+        _snapshot_etag["last"] = entry
+    return entry[1]
+
+_WEBCAM_BODY = """
       <h1>Webcam</h1>
       <div class="card">
         <p class="muted" id="streamNote">Live MJPEG stream.</p>
@@ -61,7 +70,11 @@ def webcam_page() -> str:
       });
       </script>
     """
-    return render_page("Keuka Sensor – Webcam", body)
+
+@webcam_bp.route("/webcam")
+@api_route
+def webcam_page() -> str:
+    return render_static_page("Keuka Sensor – Webcam", _WEBCAM_BODY)
 
 @webcam_bp.route("/stream")
 @api_route
@@ -80,41 +93,25 @@ def stream_mjpeg() -> Response:
 
     def gen() -> Generator[bytes, None, None]:
         boundary = b"frame"
-        last_frame = None
-        frame_repeat_count = 0
-        max_repeats = 10  # Prevent stuck frames
-        
+        seq = 0
+
         while True:
-            # Use async buffer access - non-blocking
-            frm = camera.get_jpeg_async(max_age_seconds=0.5)
-            
-            if frm is None:
-                # If no fresh frame and camera not available, break
+            # Block until the capture loop produces a frame we haven't sent;
+            # output rate follows the camera instead of a polling interval
+            got = camera.wait_jpeg(timeout=1.0, newer_than=seq)
+            if got is None:
+                # No new frame within the timeout; stop if the camera is gone
                 if not camera.available:
                     break
-                # Brief sleep and try again
-                time.sleep(0.02)
                 continue
-            
-            # Prevent sending identical frames repeatedly
-            if frm == last_frame:
-                frame_repeat_count += 1
-                if frame_repeat_count > max_repeats:
-                    time.sleep(0.02)
-                    continue
-            else:
-                frame_repeat_count = 0
-                last_frame = frm
-            
+            seq, frm = got
+
             yield (
                 b"--" + boundary + b"\r\n"
                 b"Content-Type: image/jpeg\r\n"
                 b"Cache-Control: no-cache\r\n\r\n" +
                 frm + b"\r\n"
             )
-            
-            # Small delay to prevent overwhelming the client
-            time.sleep(0.02)
 
     return Response(gen(), mimetype="multipart/x-mixed-replace; boundary=frame")
 
@@ -130,23 +127,23 @@ def snapshot_jpeg() -> Response:
     # Try to get a recent frame from buffer (non-blocking)
     frm = camera.get_jpeg_async(max_age_seconds=1.0)
     
-    # If no recent frame available, fall back to blocking call with short timeout
+    # If no recent frame available, wait for the next capture
     if frm is None:
-        t0 = time.time()
-        while time.time() - t0 < 1.0:  # Reduced timeout
-            frm = camera.get_jpeg_async(max_age_seconds=2.0)
-            if frm:
-                break
-            time.sleep(0.02)  # Shorter sleep
+        got = camera.wait_jpeg(timeout=2.0, newer_than=camera.frame_seq)
+        frm = got[1] if got else None
 
     if not frm:
         raise ApiError("No frame available", 503)
 
-    resp = Response(frm, mimetype="image/jpeg")
-    # Cache-busting headers
-    resp.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-    resp.headers["Pragma"] = "no-cache"
-    resp.headers["Expires"] = "0"
+    etag = _frame_etag(frm)
+    if etag in request.if_none_match:
+        resp = Response(status=304)
+    else:
+        resp = Response(frm, mimetype="image/jpeg")
+    # Short-lived caching plus ETag: repeat loads within a second come from the
+    # browser cache, and an unchanged frame after that costs a 304, not the JPEG
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "public, max-age=1"
     return resp
 
 @webcam_bp.route("/camera/stats")
@@ -1,10 +1,18 @@
 # ui.py
 # -----------------------------------------------------------------------------
 # UI helpers for a consistent, modern look:
-#  - _base_css(): shared CSS (light/dark via prefers-color-scheme)
-#  - render_page(): simple HTML shell with topbar + container
+#  - _base_css(): shared CSS (light/dark via prefers-color-scheme), minified
+#    once at import into _BASE_CSS_MIN for the pages
+#  - render_page(): simple HTML shell with topbar + container, prebuilt
+#    once as a string.Template
+#  - render_static_page(): render_page() cached per device FQDN, for pages
+#    with no per-request content
 # -----------------------------------------------------------------------------
 
+import re
+from functools import lru_cache
+from string import Template
+
 from ..core.utils import get_system_fqdn
 from ..core.config import VERSION
 
@@ -69,12 +77,18 @@ def _base_css():
     .thumb { width:100%; max-width: 420px; border-radius:10px; border:1px solid var(--border); display:block; }
     """
 
-def render_page(title: str, body_html: str, extra_head: str = "") -> str:
-    """Simple HTML shell used by all pages with proxy-aware navigation."""
-    device_fqdn = get_system_fqdn()
-    
-    # JavaScript to make navigation links proxy-aware
-    proxy_aware_js = """
+def _minify_css(css: str) -> str:
+    """Drop comments and collapse whitespace; selectors are left intact."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};])\s*", r"\1", css)
+    return css.replace(", ", ",").replace(": ", ":").strip()
+
+# Inlined into every page (a <link> would load before the proxy-path rewrite runs)
+_BASE_CSS_MIN = _minify_css(_base_css())
+
+# JavaScript to make navigation links proxy-aware
+_PROXY_AWARE_JS = """
     <script>
     // Make all navigation and API calls proxy-aware
     document.addEventListener('DOMContentLoaded', function() {
@@ -186,21 +200,23 @@ def render_page(title: str, body_html: str, extra_head: str = "") -> str:
     });
     </script>
     """
-    
-    return f"""<!doctype html>
+
+# Page shell with the CSS, script and version baked in (with "$" escaped for
+# Template); only the per-call values are substituted
+_PAGE_TMPL = Template(f"""<!doctype html>
 <html>
 <head>
   <meta charset="utf-8">
   <meta name="viewport" content="width=device-width, initial-scale=1">
-  <title>{title}</title>
-  <style>{_base_css()}</style>
-  {extra_head}
-  {proxy_aware_js}
+  <title>$title</title>
+  <style>{_BASE_CSS_MIN.replace('$', '$$')}</style>
+  $extra_head
+  {_PROXY_AWARE_JS.replace('$', '$$')}
 </head>
 <body>
   <header class="topbar">
     <div class="topbar-inner">
-      <div class="brand">Keuka Sensor {VERSION} by Matt Reidy © 2025 - All rights reserved.</div>
+      <div class="brand">Keuka Sensor {str(VERSION).replace('$', '$$')} by Matt Reidy © 2025 - All rights reserved.</div>
       <nav class="muted">
         <a href="/health">Health</a>
         <a href="/webcam">Webcam</a>
@@ -209,8 +225,30 @@ def render_page(title: str, body_html: str, extra_head: str = "") -> str:
     </div>
   </header>
   <main class="container">
-    <div class="device-name">{device_fqdn}</div>
-    {body_html}
+    <div class="device-name">$device_fqdn</div>
+    $body_html
   </main>
 </body>
-</html>"""
+</html>""")
+
+def render_page(title: str, body_html: str, extra_head: str = "") -> str:
+    """Simple HTML shell used by all pages with proxy-aware navigation."""
+    return _PAGE_TMPL.substitute(
+        title=title, body_html=body_html, extra_head=extra_head,
+        device_fqdn=get_system_fqdn(),
+    )
+
+@lru_cache(maxsize=16)
+def _render_page_for(title: str, body_html: str, extra_head: str, device_fqdn: str) -> str:
+    return _PAGE_TMPL.substitute(
+        title=title, body_html=body_html, extra_head=extra_head,
+        device_fqdn=device_fqdn,
+    )
+
+def render_static_page(title: str, body_html: str, extra_head: str = "") -> str:
+    """render_page() for pages without per-request content.
+
+    The device FQDN is the only part that can change under a running server,
+    so the rendered page is cached per FQDN and re-rendered when it changes.
+    """
+    return _render_page_for(title, body_html, extra_head, get_system_fqdn())
@@ -13,6 +13,12 @@ import json
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(PROJECT_ROOT))
 
+def _health_module():
+    """keuka.web.routes.health (the package attribute is shadowed by the view function)"""
+    import importlib
+    return importlib.import_module('keuka.web.routes.health')
+
+
 class TestHTTPEndpoints:
     """Test HTTP endpoints using Flask test client"""
     
@@ -91,6 +97,62 @@ class TestHTTPEndpoints:
                 for field in gps_fields:
                     assert field in data['gps'], f"Missing GPS field: {field}"
     
+    def test_health_json_gzip_negotiation(self):
+        """Test health JSON is gzipped only for clients that accept it"""
+        import gzip
+        from unittest.mock import patch
+        
+        payload = json.dumps({'tempF': 70.0, 'distanceInches': 12.0}).encode()
+        with patch.object(_health_module(), 'get_cached_payload', return_value=(payload, 1700000000)):
+            plain = self.client.get('/health.json', headers={'Accept-Encoding': 'identity'})
+            zipped = self.client.get('/health.json', headers={'Accept-Encoding': 'gzip'})
+        
+        assert plain.status_code == 200
+        assert 'Content-Encoding' not in plain.headers
+        assert plain.get_data() == payload
+        
+        assert zipped.status_code == 200
+        assert zipped.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in zipped.headers['Vary']
+        assert gzip.decompress(zipped.get_data()) == payload
+    
+    def test_health_json_revalidation(self):
+        """Test health JSON answers 304 only while the payload content is unchanged"""
+        from unittest.mock import patch
+        
+        health = _health_module()
+        first = json.dumps({'tempF': 70.0}).encode()
+        second = json.dumps({'tempF': 71.0}).encode()
+        with patch.object(health, 'get_cached_payload', return_value=(first, 1700000000)):
+            response = self.client.get('/health.json')
+            etag = response.headers['ETag']
+            last_modified = response.headers['Last-Modified']
+            assert self.client.get('/health.json', headers={'If-None-Match': etag}).status_code == 304
+        
+        # Rebuilt within the same second: the ETag no longer matches
+        with patch.object(health, 'get_cached_payload', return_value=(second, 1700000000)):
+            response = self.client.get('/health.json', headers={'If-None-Match': etag,
+                                                                'If-Modified-Since': last_modified})
+            assert response.status_code == 200
+            assert response.get_data() == second
+    
+    def test_health_payload_build_times_increase(self):
+        """Test payloads built within one second get distinct Last-Modified values"""
+        from unittest.mock import patch
+        
+        health = _health_module()
+        with patch.dict(health._sse_state), health._sse_lock:
+            first = health._store_payload(b'{"a": 1}')
+            second = health._store_payload(b'{"a": 2}')
+        assert second > first
+    
+    def test_tunnel_local_requests_skip_compression(self):
+        """Test tunneled requests ask the local server for uncompressed bodies"""
+        from keuka.tunnel_client import TunnelClient
+        
+        client = TunnelClient(sensor_name="test-sensor", server_url="http://tunnel.invalid")
+        assert client._local_session.headers['Accept-Encoding'] == 'identity'
+    
     def test_health_page_endpoint(self):
         """Test health dashboard page"""
         response = self.client.get('/health')
@@ -113,6 +175,21 @@ class TestHTTPEndpoints:
         html_content = response.get_data(as_text=True)
         assert 'Webcam' in html_content
     
+    def test_cached_pages_follow_fqdn_changes(self):
+        """Test cached page shells pick up a changed device FQDN"""
+        from unittest.mock import patch
+        
+        health = _health_module()
+        with patch('keuka.web.ui.get_system_fqdn', return_value='sensor-first'):
+            assert 'sensor-first' in self.client.get('/webcam').get_data(as_text=True)
+            _, first_suffix, first_digest = health._health_page_shell()
+        with patch('keuka.web.ui.get_system_fqdn', return_value='sensor-second'):
+            assert 'sensor-second' in self.client.get('/webcam').get_data(as_text=True)
+            _, second_suffix, second_digest = health._health_page_shell()
+        assert b'sensor-first' in first_suffix
+        assert b'sensor-second' in second_suffix
+        assert first_digest != second_digest
+    
     def test_snapshot_endpoint(self):
         """Test snapshot endpoint"""
         response = self.client.get('/snapshot')
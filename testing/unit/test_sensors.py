@@ -6,6 +6,7 @@ Unit tests for sensor modules with hardware mocking
 import pytest
 import os
 import sys
+import time
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
 
@@ -108,6 +109,82 @@ class TestSensorModules:
             # Exception should indicate test/mock mode
             assert "test mode" in str(e).lower() or "mock" in str(e).lower() or "gpio" in str(e).lower()
     
+    def test_ultrasonic_median_stops_when_stable(self):
+        """Test median sampling returns once MIN_SAMPLES readings agree"""
+        from keuka.hardware import ultrasonic
+        
+        sensor = ultrasonic.UltrasonicSensor()
+        readings = iter([10.0, 10.1, 10.05, 50.0, 50.0])
+        with patch.object(sensor, 'read_distance_inches', side_effect=lambda: next(readings)), \
+                patch('keuka.hardware.ultrasonic.time.sleep') as mock_sleep:
+            assert sensor.read_median_distance(samples=5) == 10.05
+        assert mock_sleep.call_count == ultrasonic.MIN_SAMPLES - 1
+    
+    def test_ultrasonic_sample_gap_by_backend(self):
+        """Test RPi.GPIO pings keep the full measurement-cycle gap; pigpio uses the short one"""
+        from keuka.hardware import ultrasonic
+        
+        sensor = ultrasonic.UltrasonicSensor()
+        with patch.object(sensor, 'read_distance_inches', return_value=float('nan')), \
+                patch('keuka.hardware.ultrasonic.time.sleep') as mock_sleep:
+            sensor.read_median_distance(samples=2)
+            mock_sleep.assert_called_once_with(ultrasonic.SAMPLE_GAP_S)
+            
+            sensor._pi = MagicMock()
+            mock_sleep.reset_mock()
+            sensor.read_median_distance(samples=2)
+            mock_sleep.assert_called_once_with(ultrasonic.PIGPIO_SAMPLE_GAP_S)
+        assert ultrasonic.SAMPLE_GAP_S >= 0.06
+    
+    def test_ultrasonic_gpio_arms_edge_callback(self):
+        """Test RPi.GPIO init arms echo edge detection once, before any ping"""
+        from keuka.hardware import ultrasonic
+        
+        sensor = ultrasonic.UltrasonicSensor()
+        mock_gpio = MagicMock()
+        with patch.object(sensor, '_initialize_pigpio', return_value=False), \
+                patch.object(ultrasonic, '_GPIO_AVAILABLE', True), \
+                patch.object(ultrasonic, 'GPIO', mock_gpio), \
+                patch('keuka.hardware.ultrasonic._get_gpio'), \
+                patch('keuka.hardware.ultrasonic.time.sleep'):
+            assert sensor._initialize_hardware()
+        mock_gpio.add_event_detect.assert_called_once_with(
+            sensor.echo_pin, mock_gpio.BOTH, callback=sensor._on_gpio_edge)
+        assert sensor._gpio_events
+    
+    def test_ultrasonic_gpio_pulse_from_edge_times(self):
+        """Test the RPi.GPIO pulse width comes from the callback's edge times"""
+        from keuka.hardware import ultrasonic
+        
+        sensor = ultrasonic.UltrasonicSensor()
+        sensor._gpio_initialized = True
+        sensor._gpio_events = True
+        mock_gpio = MagicMock()
+        
+        def output(pin, value):
+            # The trigger's falling edge fires a 1ms echo
+            if value is mock_gpio.LOW and mock_gpio.output.call_count == 3:
+                sensor._gpio_edges.extend([5_000_000, 6_000_000])
+        
+        mock_gpio.output.side_effect = output
+        with patch.object(ultrasonic, 'GPIO', mock_gpio):
+            distance = sensor._read_raw_data()
+        assert distance == pytest.approx(1e-3 * 13503.9 / 2.0)
+    
+    def test_ultrasonic_gpio_echo_end_timeout(self):
+        """Test a missing falling edge is reported as an echo end timeout"""
+        from keuka.hardware import ultrasonic
+        
+        sensor = ultrasonic.UltrasonicSensor(timeout_s=0.005)
+        sensor._gpio_initialized = True
+        sensor._gpio_events = True
+        mock_gpio = MagicMock()
+        mock_gpio.output.side_effect = lambda pin, value: (
+            sensor._gpio_edges.append(1) if mock_gpio.output.call_count == 3 else None)
+        with patch.object(ultrasonic, 'GPIO', mock_gpio):
+            with pytest.raises(TimeoutError, match="Echo end timeout"):
+                sensor._read_raw_data()
+    
     def test_gps_module_import(self):
         """Test GPS module can be imported"""
         from keuka.hardware import gps
@@ -136,6 +213,39 @@ class TestSensorModules:
             # Should handle gracefully in test mode
             assert "gps" in str(e).lower() or "serial" in str(e).lower()
     
+    def test_gps_port_eof_closes_port(self):
+        """Test EOF on the GPS port closes it instead of spinning on the dead fd"""
+        from keuka.hardware import gps
+        
+        read_fd, write_fd = os.pipe()
+        os.close(write_fd)  # reads now hit EOF, as after a USB unplug
+        mock_ser = MagicMock()
+        try:
+            with patch.object(gps, '_gps_ser', mock_ser), patch.object(gps, '_gps_fd', read_fd):
+                start = time.monotonic()
+                assert gps._read_nmea_lines(5.0) == {}
+                assert time.monotonic() - start < 1.0
+                assert gps._gps_ser is None
+                assert gps._gps_fd is None
+            mock_ser.close.assert_called_once()
+        finally:
+            os.close(read_fd)
+    
+    def test_gps_reader_backs_off_before_reopening(self):
+        """Test the reader thread waits before reopening a lost port"""
+        from keuka.hardware import gps
+        
+        class _Stop(Exception):
+            pass
+        
+        with patch.object(gps, '_gps_ser', None), \
+                patch.object(gps, '_gps_open') as mock_open, \
+                patch('keuka.hardware.gps.time.sleep', side_effect=[None, _Stop()]) as mock_sleep:
+            with pytest.raises(_Stop):
+                gps._gps_pump()
+        mock_sleep.assert_called_with(gps.GPS_REOPEN_DELAY_S)
+        assert mock_open.call_count == 1
+    
     def test_sensors_wrapper_import(self):
         """Test main sensors wrapper module"""
         from keuka import sensors
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the tunnel client's SSE framing and response relaying
+"""
+
+import gzip
+import io
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+import requests
+from urllib3.response import HTTPResponse
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from keuka.tunnel_client import TunnelClient
+
+
+def _sse_response(body, headers=None):
+    """Streamed response whose raw urllib3 body is read like the live tunnel"""
+    raw = HTTPResponse(body=io.BytesIO(body), headers=headers or {}, status=200,
+                       preload_content=False, decode_content=False)
+    response = Mock()
+    response.raw = raw
+    return response
+
+
+class TestSSEFraming:
+    """Test splitting the tunnel stream into SSE frames"""
+    
+    def test_plain_stream_frames(self):
+        """Test frames separated by blank lines, with CRLF normalized"""
+        body = b'data: {"type": "ping"}\n\ndata: one\r\ndata: two\r\n\r\n'
+        frames = list(TunnelClient._iter_sse_frames(_sse_response(body), 4096))
+        assert frames == [b'data: {"type": "ping"}', b'data: one\ndata: two']
+    
+    def test_gzip_stream_is_decoded(self):
+        """Test a gzip-encoded stream still yields frames"""
+        body = gzip.compress(b'data: {"type": "connected"}\n\ndata: {"type": "ping"}\n\n')
+        response = _sse_response(body, {'Content-Encoding': 'gzip'})
+        frames = list(TunnelClient._iter_sse_frames(response, 4096))
+        assert frames == [b'data: {"type": "connected"}', b'data: {"type": "ping"}']
+    
+    def test_stream_requests_identity_encoding(self):
+        """Test the SSE request asks for an uncompressed stream"""
+        client = TunnelClient(sensor_name="test-sensor", server_url="http://tunnel.invalid")
+        seen = {}
+        
+        def fake_get(url, **kwargs):
+            seen.update(kwargs['headers'])
+            client.running = False
+            raise requests.ConnectionError("offline")
+        
+        client._tunnel_session.get = fake_get
+        client.running = True
+        client._run_tunnel()
+        assert seen['Accept-Encoding'] == 'identity'
+
+    
+    def test_rejected_stream_is_closed(self):
+        """Test an error status closes the stream and backs off before reconnecting"""
+        client = TunnelClient(sensor_name="test-sensor", server_url="http://tunnel.invalid")
+        response = requests.Response()
+        response.status_code = 503
+        response.raw = HTTPResponse(body=io.BytesIO(b""), status=503, preload_content=False)
+        response.close = Mock()
+        client._tunnel_session.get = Mock(return_value=response)
+        
+        def fake_wait(delay):
+            client.running = False
+            return True
+        
+        client._stop_event.wait = Mock(side_effect=fake_wait)
+        client.running = True
+        client._run_tunnel()
+        response.close.assert_called_once()
+        assert client._sse_response is None
+        client._stop_event.wait.assert_called_once_with(1)
+
+
+
+def _local_response(body, status=200, method='GET', headers=None):
+    """Streamed local Flask response as returned by the tunnel's local session"""
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update({'Content-Length': str(len(body))} if headers is None else headers)
+    response.raw = HTTPResponse(body=io.BytesIO(body), headers=dict(response.headers), status=status,
+                                preload_content=False, request_method=method)
+    response.request = Mock(method=method)
+    return response
+
+
+class TestResponseRelay:
+    """Test relaying local responses back through the tunnel"""
+    
+    def setup_method(self):
+        """Capture tunnel POSTs instead of sending them"""
+        self.client = TunnelClient(sensor_name="test-sensor", server_url="http://tunnel.invalid")
+        self.client.running = True
+        self.posts = []
+        
+        def fake_post(url, data=None, headers=None, timeout=None):
+            length = len(data) if hasattr(data, '__len__') else None
+            body = data if isinstance(data, bytes) else b"".join(data)
+            self.posts.append({'length': length, 'body': body, 'headers': headers})
+            return Mock(raise_for_status=Mock())
+        
+        self.client._tunnel_session.post = fake_post
+    
+    def test_large_body_sent_with_content_length(self):
+        """Test a known-length body above the buffering size is sent sized"""
+        body = b"x" * (200 * 1024)
+        self.client._send_response("req-1", _local_response(body))
+        assert self.posts[0]['length'] == len(body)
+        assert self.posts[0]['body'] == body
+    
+    def test_head_response_sends_no_length(self):
+        """Test a HEAD answer is relayed empty despite its Content-Length"""
+        response = _local_response(b"", method='HEAD', headers={'Content-Length': str(200 * 1024)})
+        self.client._send_response("req-2", response)
+        assert self.posts[0]['body'] == b""
+        assert self.posts[0]['length'] == 0
+        assert self.posts[0]['headers']['X-Response-Status'] == '200'
+    
+    def test_not_modified_sends_no_length(self):
+        """Test a 304 is relayed empty despite its Content-Length"""
+        response = _local_response(b"", status=304, headers={'Content-Length': str(200 * 1024)})
+        self.client._send_response("req-3", response)
+        assert self.posts[0]['body'] == b""
+        assert self.posts[0]['length'] == 0
+        assert self.posts[0]['headers']['X-Response-Status'] == '304'
+    
+    def test_short_body_is_aborted(self):
+        """Test a body ending before its Content-Length aborts the upload and reports 502"""
+        response = _local_response(b"x" * 1024, headers={'Content-Length': str(200 * 1024)})
+        response.raw.enforce_content_length = False
+        self.client._send_response("req-4", response)
+        # The sized upload raised before completing; only the error page went out
+        assert len(self.posts) == 1
+        assert self.posts[0]['headers']['X-Response-Status'] == '502'
+    
+    def test_local_read_error_is_aborted(self):
+        """Test a local body that errors mid-stream aborts the upload and reports 502"""
+        response = _local_response(b"x" * 1024, headers={'Content-Length': str(200 * 1024)})
+        self.client._send_response("req-6", response)
+        assert len(self.posts) == 1
+        assert self.posts[0]['headers']['X-Response-Status'] == '502'
+    
+    def test_unknown_length_body_streams(self):
+        """Test a body without Content-Length is relayed whole"""
+        body = b"y" * (100 * 1024)
+        self.client._send_response("req-5", _local_response(body, headers={}))
+        assert self.posts[0]['length'] is None
+        assert self.posts[0]['body'] == body
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the code updater's command runner
+"""
+
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+# Add project root to path
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from keuka.core.updater import UpdateManager
+
+# Stands in for `git clone --progress` writing CR-separated updates to a pipe
+_FAKE_CLONE = r"""
+import sys, time
+sys.stderr.write("Cloning into 'repo'...\n")
+for pct in range(0, 100, 10):
+    sys.stderr.write(f"Receiving objects:  {pct}% ({pct}/100)\r")
+    sys.stderr.flush()
+    time.sleep(0.2)
+sys.stderr.write("Receiving objects: 100% (100/100), done.\n")
+"""
+
+
+class TestRunCmd:
+    """Test _run_cmd output handling and cancellation"""
+    
+    def setup_method(self):
+        """Capture log lines instead of writing updater.log"""
+        self.manager = UpdateManager()
+        self.logged = []
+        self.log_patch = patch.object(self.manager, '_log', side_effect=self.logged.append)
+        self.log_patch.start()
+    
+    def teardown_method(self):
+        self.log_patch.stop()
+    
+    def test_progress_updates_are_not_logged(self):
+        """Test only finished progress lines reach the log"""
+        rc, out = self.manager._run_cmd([sys.executable, "-c", _FAKE_CLONE])
+        assert rc == 0
+        assert self.logged == ["Cloning into 'repo'...", "Receiving objects: 100% (100/100), done."]
+    
+    def test_cancel_is_seen_during_progress(self):
+        """Test a cancel terminates the command while it is still reporting progress"""
+        # Cancel once the third line (the second progress update) has been read
+        checks = iter([False, False, True])
+        start = time.monotonic()
+        with patch.object(self.manager, '_check_cancel', side_effect=lambda: next(checks)):
+            rc, _ = self.manager._run_cmd([sys.executable, "-c", _FAKE_CLONE], cancelable=True)
+        assert time.monotonic() - start < 1.5
+        assert rc != 0
+        assert self.logged[-1].startswith("Canceled")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])